@@ -0,0 +1,125 @@
+"""Асинхронные представления чтения для сервера ASGI.
+
+В Django 3.2 нет асинхронного ORM, поэтому в цикле событий отдаются
+только ответы, которым не нужна БД: 304 по версиям ресурсов
+(`ConditionalGetMixin`) и данные из кэша ответов
+(`CachedListRetrieveMixin`). Запись, запросы с заголовком
+Authorization и промахи кэша выполняет синхронное представление DRF
+через sync_to_async. Ответ отрисовывается до возврата из
+представления, чтобы обработчик ASGI не переходил в поток ради
+рендеринга.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.urls import URLPattern
+from rest_framework.exceptions import APIException
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from api.mixins import CachedListRetrieveMixin, NotModified
+from api.urls import router
+
+ASYNC_ROUTES = (
+    'categories-list',
+    'genres-list',
+    'titles-list',
+    'titles-detail',
+    'reviews-list',
+    'comments-list',
+)
+
+
+def detach(response):
+    """Отрисованный ответ DRF в виде HttpResponse без отложенного
+    рендеринга.
+    """
+    if not isinstance(response, Response):
+        return response
+    response.render()
+    result = HttpResponse(response.content, status=response.status_code)
+    for header, value in response.items():
+        result[header] = value
+    return result
+
+
+def bind_view(callback, request, args, kwargs):
+    """Экземпляр вьюсета с обработчиками действий, как в
+    `ViewSetMixin.as_view`, и запрос DRF к нему.
+    """
+    view = callback.cls(**callback.initkwargs)
+    view.action_map = dict(callback.actions)
+    view.action_map.setdefault('head', view.action_map.get('get'))
+    for method, action in view.action_map.items():
+        setattr(view, method, getattr(view, action))
+    view.args, view.kwargs = args, kwargs
+    view.request = view.initialize_request(request, *args, **kwargs)
+    view.headers = view.default_response_headers
+    return view, view.request
+
+
+def cached_response(callback, request, args, kwargs):
+    """Ответ без обращения к БД: 304 или данные из кэша ответов.
+    None, если запрос нужно выполнить синхронным представлением.
+    """
+    view, request = bind_view(callback, request, args, kwargs)
+    try:
+        view.initial(request, *args, **kwargs)
+    except NotModified as exc:
+        response = view.handle_exception(exc)
+    except APIException:
+        return None
+    else:
+        if not (
+            isinstance(view, CachedListRetrieveMixin)
+            and isinstance(request.accepted_renderer, JSONRenderer)
+        ):
+            return None
+        data = view.response_cache.get(request, count_miss=False)
+        if data is None:
+            return None
+        response = Response(data, headers={'X-Cache': 'HIT'})
+    return view.finalize_response(request, response, *args, **kwargs)
+
+
+def as_async_view(callback):
+    """Асинхронное представление поверх представления вьюсета."""
+
+    def sync_view(request, *args, **kwargs):
+        return detach(callback(request, *args, **kwargs))
+
+    run_sync_view = sync_to_async(sync_view, thread_sensitive=True)
+
+    # Как у представления DRF: имя и атрибуты (cls, actions,
+    # csrf_exempt); csrf_exempt из django.views.decorators обернул бы
+    # корутину в синхронную функцию.
+    @wraps(callback)
+    async def view(request, *args, **kwargs):
+        if (
+            request.method in ('GET', 'HEAD')
+            and 'HTTP_AUTHORIZATION' not in request.META
+        ):
+            response = cached_response(callback, request, args, kwargs)
+            if response is not None:
+                return detach(response)
+        return await run_sync_view(request, *args, **kwargs)
+
+    return view
+
+
+def async_urlpatterns():
+    """Маршруты роутера API в исходном порядке; у ASYNC_ROUTES (кроме
+    вариантов с суффиксом формата) представления асинхронные. Порядок
+    важен: маршруты действий (`titles/export/`) стоят раньше
+    `titles/<pk>/`.
+    """
+    return [
+        URLPattern(
+            pattern.pattern, as_async_view(pattern.callback), name=pattern.name
+        )
+        if pattern.name in ASYNC_ROUTES
+        and 'format' not in pattern.pattern.regex.groupindex
+        else pattern
+        for pattern in router.urls
+    ]
@@ -0,0 +1,170 @@
+"""Аутентификация по JWT без чтения пользователя из БД.
+
+Токен доступа, выдаваемый GetTokensForUserView, содержит имя, роль,
+признак суперпользователя и версию токенов пользователя. По ним
+собирается экземпляр User с отложенными полями: остальные поля
+загружаются из БД только при обращении к ним. Проверенные токены
+хранятся в ограниченном LRU-кэше процесса, и подпись повторно не
+проверяется. Текущая версия токенов пользователя хранится в кэше
+Django; любое сохранение пользователя, меняющее имя, роль, права
+суперпользователя или активность, увеличивает ее (`bump_token_version`),
+и выданные ранее токены перестают приниматься. Версия есть только у
+активного пользователя, поэтому токены отключенной учетной записи тоже
+отклоняются. Токены без
+этих claims (выданные до перехода) проверяются по-старому, с загрузкой
+пользователя из БД.
+"""
+from collections import OrderedDict
+from threading import Lock
+from time import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reviews.models import User
+
+CLAIM_FIELDS = ('username', 'role', 'is_superuser', 'token_version')
+# Поля, при изменении которых выданные токены отзываются: claims токена
+# и признак активной учетной записи.
+REVOKING_FIELDS = ('username', 'role', 'is_superuser', 'is_active')
+
+
+class RoleAccessToken(AccessToken):
+    """Токен доступа с полями пользователя, нужными для прав доступа."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for field in CLAIM_FIELDS:
+            token[field] = getattr(user, field)
+        return token
+
+
+class VerifiedTokens:
+    """Ограниченный LRU-кэш проверенных токенов: «строка токена: токен»."""
+
+    def __init__(self, size):
+        self.size = size
+        self._tokens = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, raw_token):
+        with self._lock:
+            token = self._tokens.get(raw_token)
+            if token is not None:
+                self._tokens.move_to_end(raw_token)
+            return token
+
+    def set(self, raw_token, token):
+        with self._lock:
+            self._tokens[raw_token] = token
+            self._tokens.move_to_end(raw_token)
+            while len(self._tokens) > self.size:
+                self._tokens.popitem(last=False)
+
+    def discard(self, raw_token):
+        with self._lock:
+            self._tokens.pop(raw_token, None)
+
+    def clear(self):
+        with self._lock:
+            self._tokens.clear()
+
+
+verified_tokens = VerifiedTokens(settings.VERIFIED_TOKENS_CACHE_SIZE)
+
+
+def version_key(user_id):
+    return f'token_version:{user_id}'
+
+
+def get_token_version(user_id):
+    """Текущая версия токенов пользователя или None, если его нет или
+    его учетная запись отключена.
+    """
+    key = version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = User.objects.filter(
+            pk=user_id, is_active=True
+        ).values_list('token_version', flat=True).first()
+        if version is not None:
+            cache.set(key, version, settings.TOKEN_VERSION_CACHE_TIMEOUT)
+    return version
+
+
+def reset_token_version(user_id):
+    """Удаляет версию токенов пользователя из кэша после фиксации
+    транзакции, в которой пользователь изменен или удален.
+    """
+    key = version_key(user_id)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def bump_token_version(user, update_fields=None):
+    """Увеличивает версию токенов сохраняемого пользователя, если
+    сохранение меняет поля REVOKING_FIELDS (обработчик pre_save, поэтому
+    отзыв работает при любом способе записи: API, админка, shell).
+    """
+    fields = [
+        field for field in REVOKING_FIELDS
+        if update_fields is None or field in update_fields
+    ]
+    if user._state.adding or not fields:
+        return
+    stored = User.objects.filter(pk=user.pk).values(
+        'token_version', *fields
+    ).first()
+    if stored is None or all(
+        stored[field] == getattr(user, field) for field in fields
+    ):
+        return
+    user.token_version = stored['token_version'] + 1
+    if update_fields is not None and 'token_version' not in update_fields:
+        User.objects.filter(pk=user.pk).update(
+            token_version=user.token_version
+        )
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация с пользователем из claims токена."""
+
+    def get_validated_token(self, raw_token):
+        token = verified_tokens.get(raw_token)
+        if token is not None and token['exp'] > time():
+            return token
+        verified_tokens.discard(raw_token)
+        token = super().get_validated_token(raw_token)
+        verified_tokens.set(raw_token, token)
+        return token
+
+    def get_user(self, validated_token):
+        if 'token_version' not in validated_token:
+            return super().get_user(validated_token)
+        user_id = validated_token[api_settings.USER_ID_CLAIM]
+        version = get_token_version(user_id)
+        if version is None:
+            raise AuthenticationFailed(
+                'Пользователь не найден или отключен.',
+                code='user_not_found',
+            )
+        if version != validated_token['token_version']:
+            raise AuthenticationFailed('Токен отозван.', code='token_revoked')
+        values = {
+            api_settings.USER_ID_FIELD: user_id,
+            **{field: validated_token[field] for field in CLAIM_FIELDS},
+        }
+        field_names = [
+            field.attname for field in User._meta.concrete_fields
+            if field.attname in values
+        ]
+        return User.from_db(
+            DEFAULT_DB_ALIAS,
+            field_names,
+            [values[name] for name in field_names],
+        )
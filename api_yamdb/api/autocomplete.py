@@ -0,0 +1,137 @@
+"""Индекс префиксного поиска названий для автодополнения.
+
+Названия произведений, жанров и категорий хранятся в памяти процесса
+в отсортированных массивах, поиск выполняется через `bisect` без
+обращения к БД. Индекс строится при первом запросе и обновляется
+сигналами при записи. Номер версии индекса хранится в кэше Django:
+если другой процесс изменил данные, индекс перестраивается.
+"""
+from bisect import bisect_left, insort
+from threading import RLock
+
+from django.core.cache import cache
+
+from reviews.models import Category, Genre, Title
+
+VERSION_CACHE_KEY = 'autocomplete:version'
+
+
+def normalize(text):
+    return text.casefold()
+
+
+class PrefixIndex:
+    """Отсортированный массив пар (название, pk) с данными для ответа."""
+
+    def __init__(self):
+        self._keys = []
+        self._items = {}
+
+    def build(self, items):
+        self._items = {pk: (normalize(name), data) for pk, name, data in items}
+        self._keys = sorted(
+            (key, pk) for pk, (key, _) in self._items.items()
+        )
+
+    def add(self, pk, name, data):
+        self.remove(pk)
+        key = normalize(name)
+        self._items[pk] = (key, data)
+        insort(self._keys, (key, pk))
+
+    def remove(self, pk):
+        item = self._items.pop(pk, None)
+        if item is None:
+            return
+        position = bisect_left(self._keys, (item[0], pk))
+        del self._keys[position]
+
+    def search(self, prefix, limit):
+        prefix = normalize(prefix)
+        position = bisect_left(self._keys, (prefix,))
+        result = []
+        for key, pk in self._keys[position:position + limit]:
+            if not key.startswith(prefix):
+                break
+            result.append(self._items[pk][1])
+        return result
+
+
+class Autocomplete:
+    """Набор префиксных индексов для моделей Title, Genre и Category."""
+
+    sources = {
+        'titles': (Title, ('id', 'name')),
+        'genres': (Genre, ('name', 'slug')),
+        'categories': (Category, ('name', 'slug')),
+    }
+
+    def __init__(self):
+        self._lock = RLock()
+        self._indexes = None
+        self._version = None
+
+    def get_section(self, model):
+        for section, (source, fields) in self.sources.items():
+            if source is model:
+                return section, fields
+        return None, None
+
+    def rebuild(self):
+        with self._lock:
+            version = cache.get(VERSION_CACHE_KEY)
+            indexes = {}
+            for section, (model, fields) in self.sources.items():
+                index = PrefixIndex()
+                rows = model.objects.order_by().values(
+                    'pk', *fields
+                ).iterator()
+                index.build(
+                    (row.pop('pk'), row['name'], row) for row in rows
+                )
+                indexes[section] = index
+            self._indexes, self._version = indexes, version
+
+    def search(self, prefix, limit):
+        with self._lock:
+            if (
+                self._indexes is None
+                or self._version != cache.get(VERSION_CACHE_KEY)
+            ):
+                self.rebuild()
+            return {
+                section: index.search(prefix, limit)
+                for section, index in self._indexes.items()
+            }
+
+    def bump_version(self):
+        cache.add(VERSION_CACHE_KEY, 0, timeout=None)
+        return cache.incr(VERSION_CACHE_KEY)
+
+    def update(self, *instances, deleted=False):
+        """Обновляет индекс после сохранения или удаления объектов."""
+        with self._lock:
+            stale = self._version != cache.get(VERSION_CACHE_KEY)
+            version = self.bump_version()
+            if self._indexes is None:
+                return
+            if stale:
+                self._indexes = None
+                return
+            for instance in instances:
+                section, fields = self.get_section(type(instance))
+                if section is None:
+                    continue
+                index = self._indexes[section]
+                if deleted:
+                    index.remove(instance.pk)
+                else:
+                    index.add(
+                        instance.pk,
+                        instance.name,
+                        {field: getattr(instance, field) for field in fields},
+                    )
+            self._version = version
+
+
+autocomplete = Autocomplete()
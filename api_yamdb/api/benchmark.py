@@ -0,0 +1,467 @@
+"""Замеры маршрутов API внутри процесса через WSGI-приложение.
+
+Каждый сценарий - запрос к одному маршруту `api/urls.py` от имени
+анонима, пользователя или администратора. Запрос проходит весь стек
+Django (middleware, DRF, сериализацию) так же, как в gunicorn, но без
+сети, поэтому различия между запусками отражают изменения кода.
+Изменяющие запросы выполняются в транзакции, которая откатывается,
+поэтому данные между итерациями не меняются.
+
+`ConcurrencyBenchmark` сравнивает пропускную способность сценариев
+чтения при одновременных запросах: WSGI-приложение в пуле потоков
+(как gunicorn с --threads) и ASGI-приложение в цикле событий.
+Медленный клиент задается задержкой чтения ответа: под WSGI он
+занимает поток, под ASGI - только соединение.
+"""
+import asyncio
+import json
+import statistics
+import sys
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from io import BytesIO
+from time import perf_counter, sleep
+from urllib.parse import urlencode
+
+from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import caches
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections, connection, transaction
+from django.urls import reverse
+
+from api.authentication import RoleAccessToken
+from core.handlers import URLConfASGIHandler
+from reviews.models import Category, Comment, Genre, Title, User
+from users import const as users_const
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+Scenario = namedtuple(
+    'Scenario',
+    ('name', 'method', 'route', 'kwargs', 'query', 'data', 'client',
+     'max_iterations'),
+    defaults=({}, {}, None, 'anon', None),
+)
+
+
+def api_route_names():
+    """Имена всех маршрутов `api/urls.py`."""
+    from api.urls import router, urlpatterns
+    return {
+        pattern.name for pattern in (*urlpatterns, *router.urls)
+        if getattr(pattern, 'name', None)
+    }
+
+
+def load_sample():
+    """Объекты БД, к которым обращаются сценарии."""
+    title = Title.objects.order_by('-rating_count', 'pk').first()
+    comment = Comment.objects.select_related('review').order_by(
+        '-review__title__rating_count', 'pk'
+    ).first()
+    admin = User.objects.filter(role=users_const.ROLE_ADMIN).first()
+    if title is None or comment is None or admin is None:
+        return None
+    review = title.reviews.order_by('pk').first()
+    user = User.objects.filter(
+        role=users_const.ROLE_USER
+    ).order_by('pk').first()
+    if user is None:
+        return None
+    return {
+        'title': title,
+        'unreviewed_title': Title.objects.exclude(
+            reviews__author=user
+        ).order_by('-rating_count', 'pk').first(),
+        'review': review,
+        'comment': comment,
+        'admin': admin,
+        'user': user,
+        'category': Category.objects.order_by('pk').first(),
+        'genre': Genre.objects.order_by('pk').first(),
+    }
+
+
+def build_scenarios(sample):
+    title, review, comment = (
+        sample['title'], sample['review'], sample['comment']
+    )
+    category, genre, user = (
+        sample['category'], sample['genre'], sample['user']
+    )
+    title_kwargs = {'title_id': title.pk}
+    review_kwargs = {'title_id': title.pk, 'pk': review.pk}
+    comment_list_kwargs = {
+        'title_id': comment.review.title_id,
+        'review_id': comment.review_id,
+    }
+    comment_kwargs = {**comment_list_kwargs, 'pk': comment.pk}
+    new_title = {
+        'name': 'Замер', 'year': 2000,
+        'category': category.slug, 'genre': [genre.slug],
+    }
+    word = title.name.split()[0]
+    return [
+        Scenario('root', 'GET', 'api-root'),
+        Scenario('categories', 'GET', 'categories-list'),
+        Scenario('categories create', 'POST', 'categories-list',
+                 data={'name': 'Замер', 'slug': 'bench'}, client='admin'),
+        Scenario('categories delete', 'DELETE', 'categories-detail',
+                 kwargs={'slug': category.slug}, client='admin'),
+        Scenario('genres', 'GET', 'genres-list'),
+        Scenario('genres create', 'POST', 'genres-list',
+                 data={'name': 'Замер', 'slug': 'bench'}, client='admin'),
+        Scenario('genres delete', 'DELETE', 'genres-detail',
+                 kwargs={'slug': genre.slug}, client='admin'),
+        Scenario('titles', 'GET', 'titles-list'),
+        Scenario('titles filtered', 'GET', 'titles-list',
+                 query={'genre': genre.slug, 'category': category.slug}),
+        Scenario('titles search', 'GET', 'titles-list', query={'q': word}),
+        Scenario('titles cursor', 'GET', 'titles-list',
+                 query={'cursor': ''}),
+        Scenario('titles create', 'POST', 'titles-list',
+                 data=new_title, client='admin'),
+        Scenario('title', 'GET', 'titles-detail', kwargs={'pk': title.pk}),
+        Scenario('title update', 'PATCH', 'titles-detail',
+                 kwargs={'pk': title.pk}, data={'year': 2001},
+                 client='admin'),
+        Scenario('title delete', 'DELETE', 'titles-detail',
+                 kwargs={'pk': title.pk}, client='admin'),
+        Scenario('titles bulk', 'POST', 'titles-bulk-create',
+                 data=[new_title] * 100, client='admin'),
+        Scenario('titles export', 'GET', 'titles-export', client='admin',
+                 max_iterations=3),
+        Scenario('reviews', 'GET', 'reviews-list', kwargs=title_kwargs),
+        Scenario('reviews cursor', 'GET', 'reviews-list',
+                 kwargs=title_kwargs, query={'cursor': ''}),
+        Scenario('reviews create', 'POST', 'reviews-list',
+                 kwargs={'title_id': sample['unreviewed_title'].pk},
+                 data={'text': 'Замер', 'score': 7}, client='user'),
+        Scenario('review', 'GET', 'reviews-detail', kwargs=review_kwargs),
+        Scenario('review update', 'PATCH', 'reviews-detail',
+                 kwargs=review_kwargs, data={'score': 5}, client='admin'),
+        Scenario('review delete', 'DELETE', 'reviews-detail',
+                 kwargs=review_kwargs, client='admin'),
+        Scenario('comments', 'GET', 'comments-list',
+                 kwargs=comment_list_kwargs),
+        Scenario('comments cursor', 'GET', 'comments-list',
+                 kwargs=comment_list_kwargs, query={'cursor': ''}),
+        Scenario('comments create', 'POST', 'comments-list',
+                 kwargs=comment_list_kwargs, data={'text': 'Замер'},
+                 client='user'),
+        Scenario('comment', 'GET', 'comments-detail', kwargs=comment_kwargs),
+        Scenario('comment update', 'PATCH', 'comments-detail',
+                 kwargs=comment_kwargs, data={'text': 'Замер'},
+                 client='admin'),
+        Scenario('comment delete', 'DELETE', 'comments-detail',
+                 kwargs=comment_kwargs, client='admin'),
+        Scenario('autocomplete', 'GET', 'autocomplete',
+                 query={'q': word[:3]}),
+        Scenario('users', 'GET', 'users-list', client='admin'),
+        Scenario('users create', 'POST', 'users-list',
+                 data={'username': 'bench', 'email': 'bench@yamdb.fake'},
+                 client='admin'),
+        Scenario('user', 'GET', 'users-detail',
+                 kwargs={'username': user.username}, client='admin'),
+        Scenario('user update', 'PATCH', 'users-detail',
+                 kwargs={'username': user.username},
+                 data={'bio': 'Замер'}, client='admin'),
+        Scenario('user delete', 'DELETE', 'users-detail',
+                 kwargs={'username': user.username}, client='admin'),
+        Scenario('me', 'GET', 'me', client='user'),
+        Scenario('me update', 'PATCH', 'me', data={'bio': 'Замер'},
+                 client='user'),
+        Scenario('signup', 'POST', 'signup',
+                 data={'username': 'bench', 'email': 'bench@yamdb.fake'}),
+        Scenario('signup existing', 'POST', 'signup',
+                 data={'username': user.username, 'email': user.email}),
+        Scenario('token', 'POST', 'token', data={
+            'username': user.username,
+            'confirmation_code': default_token_generator.make_token(user),
+        }),
+    ]
+
+
+class SqlRecorder:
+    """Обертка выполнения SQL, считающая запросы и их время."""
+
+    def __init__(self):
+        self.count = 0
+        self.time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.time += perf_counter() - started
+
+
+@contextmanager
+def rolled_back():
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+@contextmanager
+def persistent_connection():
+    """Как тестовый клиент Django: соединение не закрывается после
+    запроса, иначе откатываемая транзакция будет прервана.
+    """
+    request_started.disconnect(close_old_connections)
+    request_finished.disconnect(close_old_connections)
+    try:
+        yield
+    finally:
+        request_started.connect(close_old_connections)
+        request_finished.connect(close_old_connections)
+
+
+def percentile(quantiles, number):
+    return round(quantiles[number - 1] * 1000, 3)
+
+
+class WsgiBenchmark:
+    """Прогон сценариев через WSGI-приложение Django."""
+
+    def __init__(self, sample, iterations, warmup, cold=False):
+        self.application = WSGIHandler()
+        self.iterations = iterations
+        self.warmup = warmup
+        self.cold = cold
+        # Токены с claims роли, как у GetTokensForUserView: замеряется
+        # тот же путь аутентификации, что и в работе.
+        self.headers = {
+            client: {
+                'HTTP_AUTHORIZATION':
+                    f'Bearer {RoleAccessToken.for_user(user)}'
+            }
+            for client, user in (
+                ('admin', sample['admin']), ('user', sample['user'])
+            )
+        }
+        self.headers['anon'] = {}
+
+    def environ(self, scenario):
+        body = b''
+        if scenario.method not in SAFE_METHODS:
+            body = json.dumps(scenario.data).encode()
+        return {
+            'REQUEST_METHOD': scenario.method,
+            'PATH_INFO': reverse(scenario.route, kwargs=scenario.kwargs),
+            'QUERY_STRING': urlencode(scenario.query),
+            'SERVER_NAME': 'testserver',
+            'SERVER_PORT': '80',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'CONTENT_TYPE': 'application/json',
+            'CONTENT_LENGTH': str(len(body)),
+            'HTTP_ACCEPT': 'application/json',
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': 'http',
+            'wsgi.input': BytesIO(body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': False,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+            **self.headers[scenario.client],
+        }
+
+    def request(self, scenario, client_delay=0):
+        """Выполняет запрос и возвращает код ответа; клиент читает
+        каждую часть ответа `client_delay` секунд.
+        """
+        statuses = []
+        result = self.application(
+            self.environ(scenario),
+            lambda status, headers, exc_info=None: statuses.append(status),
+        )
+        try:
+            for _ in result:
+                if client_delay:
+                    sleep(client_delay)
+        finally:
+            result.close()
+        return int(statuses[0].split()[0])
+
+    def run(self, scenario):
+        iterations = min(
+            self.iterations, scenario.max_iterations or self.iterations
+        )
+        durations, queries, sql_times = [], [], []
+        statuses = Counter()
+        isolation = (
+            nullcontext if scenario.method in SAFE_METHODS else rolled_back
+        )
+        with persistent_connection():
+            for number in range(self.warmup + iterations):
+                if self.cold:
+                    for cache in caches.all():
+                        cache.clear()
+                recorder = SqlRecorder()
+                with isolation(), connection.execute_wrapper(recorder):
+                    started = perf_counter()
+                    status = self.request(scenario)
+                    duration = perf_counter() - started
+                if number < self.warmup:
+                    continue
+                durations.append(duration)
+                queries.append(recorder.count)
+                sql_times.append(recorder.time)
+                statuses[status] += 1
+        quantiles = statistics.quantiles(
+            durations * 2 if len(durations) == 1 else durations,
+            n=100,
+            method='inclusive',
+        )
+        return {
+            'name': scenario.name,
+            'method': scenario.method,
+            'route': scenario.route,
+            'client': scenario.client,
+            'statuses': {str(code): count for code, count in statuses.items()},
+            'iterations': iterations,
+            'p50_ms': percentile(quantiles, 50),
+            'p95_ms': percentile(quantiles, 95),
+            'p99_ms': percentile(quantiles, 99),
+            'mean_ms': round(statistics.fmean(durations) * 1000, 3),
+            'throughput_rps': round(len(durations) / sum(durations), 1),
+            'queries': round(statistics.fmean(queries), 2),
+            'queries_max': max(queries),
+            'sql_ms': round(statistics.fmean(sql_times) * 1000, 3),
+        }
+
+
+def asgi_scope(method, path, query='', headers=()):
+    """Область HTTP-запроса ASGI."""
+    return {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query.encode(),
+        'root_path': '',
+        'headers': [
+            (name.lower().encode(), value.encode())
+            for name, value in (('Host', 'testserver'), *headers)
+        ],
+        'client': ('127.0.0.1', 50000),
+        'server': ('testserver', 80),
+    }
+
+
+async def asgi_request(application, scope, body=b'', client_delay=0):
+    """Выполняет запрос к ASGI-приложению; клиент читает каждую часть
+    ответа `client_delay` секунд. Возвращает код, заголовки и тело.
+    """
+    messages = [{'type': 'http.request', 'body': body}]
+    disconnected = asyncio.Event()
+    response = {'headers': {}, 'body': b''}
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            response['status'] = message['status']
+            response['headers'] = {
+                name.decode().lower(): value.decode()
+                for name, value in message['headers']
+            }
+        elif message['type'] == 'http.response.body':
+            response['body'] += message.get('body', b'')
+            if client_delay:
+                await asyncio.sleep(client_delay)
+
+    await application(scope, receive, send)
+    disconnected.set()
+    return response['status'], response['headers'], response['body']
+
+
+class ConcurrencyBenchmark(WsgiBenchmark):
+    """Пропускная способность сценария чтения при `concurrency`
+    одновременных клиентах: WSGI в пуле из `threads` потоков и ASGI в
+    цикле событий.
+    """
+
+    def __init__(self, sample, requests, concurrency, threads,
+                 client_delay=0):
+        super().__init__(sample, requests, warmup=1)
+        self.concurrency = concurrency
+        self.threads = threads
+        self.client_delay = client_delay
+        self.asgi_application = URLConfASGIHandler()
+
+    def scope(self, scenario):
+        headers = [('Accept', 'application/json')]
+        headers.extend(
+            (name[len('HTTP_'):].replace('_', '-'), value)
+            for name, value in self.headers[scenario.client].items()
+        )
+        return asgi_scope(
+            scenario.method,
+            reverse(scenario.route, kwargs=scenario.kwargs),
+            urlencode(scenario.query),
+            headers,
+        )
+
+    def run_wsgi(self, scenario):
+        with ThreadPoolExecutor(min(self.threads, self.concurrency)) as pool:
+            started = perf_counter()
+            statuses = list(pool.map(
+                lambda number: self.request(scenario, self.client_delay),
+                range(self.iterations),
+            ))
+            return perf_counter() - started, statuses
+
+    def run_asgi(self, scenario):
+        async def run():
+            semaphore = asyncio.Semaphore(self.concurrency)
+
+            async def request():
+                async with semaphore:
+                    status, _, _ = await asgi_request(
+                        self.asgi_application,
+                        self.scope(scenario),
+                        client_delay=self.client_delay,
+                    )
+                    return status
+
+            started = perf_counter()
+            statuses = await asyncio.gather(
+                *(request() for _ in range(self.iterations))
+            )
+            return perf_counter() - started, statuses
+
+        return asyncio.run(run())
+
+    def run(self, scenario):
+        if scenario.method not in SAFE_METHODS:
+            raise ValueError('Сравнивать можно только сценарии чтения.')
+        for _ in range(self.warmup):
+            self.request(scenario)
+        result = {
+            'name': scenario.name,
+            'route': scenario.route,
+            'client': scenario.client,
+            'requests': self.iterations,
+            'concurrency': self.concurrency,
+            'threads': self.threads,
+            'client_delay_ms': round(self.client_delay * 1000, 3),
+        }
+        for server, run in (('wsgi', self.run_wsgi), ('asgi', self.run_asgi)):
+            duration, statuses = run(scenario)
+            result[f'{server}_rps'] = round(len(statuses) / duration, 1)
+            result[f'{server}_statuses'] = {
+                str(code): count for code, count in Counter(statuses).items()
+            }
+        return result
@@ -0,0 +1,132 @@
+"""Версии ресурсов и кэш ответов API с инвалидацией по тегам.
+
+Каждый тег (`titles`, `title:<id>`, `genres` и т.д.) имеет версию -
+время последнего изменения в наносекундах. Ответ, зависящий от тегов,
+актуален, пока не изменилась ни одна из их версий. Версии читаются
+до обращения к БД, поэтому ответ, собранный одновременно с записью,
+не будет сохранен как актуальный. Версии живут не дольше TIMEOUT
+своего кэша: после вытеснения тег получает новую версию, и зависящие
+от него ответы просто собираются заново.
+"""
+import hashlib
+import time
+from threading import Lock
+from urllib.parse import urlencode
+
+from django.core.cache import caches
+
+from core.metrics import Counter, registry
+
+ALL_TAG = '*'
+
+
+class TagVersions:
+    """Хранилище версий тегов в кэше Django."""
+
+    def __init__(self, alias, prefix):
+        self.alias = alias
+        self.prefix = prefix
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def tag_key(self, tag):
+        return f'{self.prefix}:tag:{tag}'
+
+    def get(self, tags):
+        """Возвращает текущие версии тегов, создавая отсутствующие."""
+        keys = [self.tag_key(tag) for tag in (ALL_TAG, *tags)]
+        versions = self.cache.get_many(keys)
+        missing = {
+            key: time.time_ns() for key in keys if key not in versions
+        }
+        if missing:
+            self.cache.set_many(missing)
+            versions.update(missing)
+        return versions
+
+    def is_current(self, versions):
+        return self.cache.get_many(versions) == versions
+
+    def invalidate(self, *tags):
+        version = time.time_ns()
+        self.cache.set_many({self.tag_key(tag): version for tag in tags})
+
+    def invalidate_all(self):
+        self.invalidate(ALL_TAG)
+
+
+def normalize_url(request):
+    """Адрес запроса с отсортированными параметрами строки запроса."""
+    query = urlencode(sorted(
+        (key, value)
+        for key, values in request.query_params.lists()
+        for value in values
+    ))
+    return f'{request.get_host()}{request.path}?{query}'
+
+
+class TaggedResponseCache:
+    """Кэш ответов, ключ которого - нормализованный URL запроса."""
+
+    def __init__(self, alias, prefix, versions):
+        self.alias = alias
+        self.prefix = prefix
+        self.versions = versions
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def make_key(self, request):
+        digest = hashlib.md5(normalize_url(request).encode()).hexdigest()
+        return f'{self.prefix}:response:{digest}'
+
+    def get(self, request, count_miss=True):
+        """Актуальные данные ответа или None. Промах не учитывается
+        при `count_miss=False`: запрос еще обратится к кэшу повторно.
+        """
+        entry = self.cache.get(self.make_key(request))
+        if entry is not None:
+            data, versions = entry
+            if self.versions.is_current(versions):
+                self._count(hit=True)
+                return data
+        if count_miss:
+            self._count(hit=False)
+        return None
+
+    def set(self, request, data, versions):
+        self.cache.set(self.make_key(request), (data, versions))
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+
+resource_versions = TagVersions('versions', 'resources')
+
+title_cache = TaggedResponseCache('responses', 'titles', resource_versions)
+
+title_cache_requests = Counter(
+    registry,
+    'yamdb_title_cache_requests_total',
+    'Обращения к кэшу ответов произведений.',
+    ('result',),
+)
+
+registry.register_callback(title_cache_requests, lambda: {
+    ('hit',): title_cache.stats()['hits'],
+    ('miss',): title_cache.stats()['misses'],
+})
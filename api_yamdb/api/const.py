@@ -7,3 +7,11 @@ MAXIMUM_RATING = 10
 MAX_LENGTH_EMAIL_FIELD = 254
 
 MAX_LENGTH_USERNAME_FIELD = 150
+
+AUTOCOMPLETE_DEFAULT_LIMIT = 10
+
+AUTOCOMPLETE_MAX_LIMIT = 50
+
+MAX_TITLES_BULK_SIZE = 5000
+
+EXPORT_BATCH_SIZE = 1000
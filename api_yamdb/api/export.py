@@ -0,0 +1,31 @@
+import json
+
+from django.db import transaction
+
+from api import const
+from api.serializers import TitleGetSerializer
+from reviews.models import Title
+
+
+def export_titles(batch_size=const.EXPORT_BATCH_SIZE):
+    """Генератор строк NDJSON со всеми произведениями.
+
+    Произведения читаются пакетами по `id` внутри одной транзакции:
+    все пакеты видят один снимок БД, а в памяти одновременно находится
+    не больше одного пакета.
+    """
+    with transaction.atomic():
+        last_id = 0
+        while True:
+            titles = list(
+                Title.objects.filter(pk__gt=last_id)
+                .order_by('pk')
+                .prefetch_related('genretitle_set')[:batch_size]
+            )
+            if not titles:
+                return
+            yield ''.join(
+                json.dumps(title, ensure_ascii=False) + '\n'
+                for title in TitleGetSerializer(titles, many=True).data
+            )
+            last_id = titles[-1].pk
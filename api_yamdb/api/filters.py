@@ -1,5 +1,9 @@
+from django.db.models import Q
 from django_filters import rest_framework as filters
+from rest_framework.exceptions import ValidationError
 
+from api.slug_cache import category_cache, genre_cache
+from reviews import search
 from reviews.models import Title
 
 
@@ -7,9 +11,43 @@ class TitleFilter(filters.FilterSet):
     """Кастомный фильтрсет для вьюсета Title."""
 
     name = filters.CharFilter(field_name='name', lookup_expr='contains')
-    category = filters.CharFilter(field_name='category__slug')
-    genre = filters.CharFilter(field_name='genre__slug')
+    category = filters.CharFilter(method='filter_category')
+    genre = filters.CharFilter(method='filter_genre')
+    q = filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
         fields = ('name', 'category', 'genre', 'year')
+
+    def filter_category(self, queryset, name, value):
+        """Фильтр по slug категории без JOIN с таблицей категорий."""
+        category = category_cache.get_by_slug(value)
+        if category is None:
+            return queryset.none()
+        return queryset.filter(category_id=category.pk)
+
+    def filter_genre(self, queryset, name, value):
+        """Фильтр по slug жанра без JOIN с таблицей жанров."""
+        genre = genre_cache.get_by_slug(value)
+        if genre is None:
+            return queryset.none()
+        return queryset.filter(genre=genre.pk)
+
+    def filter_search(self, queryset, name, value):
+        """Полнотекстовый поиск по названию и описанию.
+        Без явного параметра `ordering` результаты упорядочены
+        по релевантности. Режим курсора сортирует по названию, поэтому
+        вместе с поиском не поддерживается.
+        """
+        if 'cursor' in self.data:
+            raise ValidationError({'cursor': [
+                'Постраничный вывод по курсору нельзя сочетать с поиском '
+                '`q`: используйте `limit` и `offset`.'
+            ]})
+        if not search.is_available():
+            return queryset.filter(
+                Q(name__icontains=value) | Q(description__icontains=value)
+            )
+        return search.search_titles(
+            queryset, value, by_rank='ordering' not in self.data
+        )
@@ -0,0 +1,148 @@
+import json
+import logging
+import platform
+import subprocess
+from datetime import datetime, timezone
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+from api.benchmark import (
+    WsgiBenchmark, api_route_names, build_scenarios, load_sample
+)
+from reviews.management.commands.csv_to_db import MODELS_DATA
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ('git', 'rev-parse', 'HEAD'),
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    """Команда, замеряющая задержку и запросы к БД маршрутов API.
+    Использование:
+    1. Сгенерировать данные: python manage.py generate_data.
+    2. Запустить команду: python manage.py benchmark --output run.json.
+    Для каждого сценария выводятся p50/p95/p99, пропускная способность,
+    среднее количество и время SQL-запросов на запрос. JSON-файлы
+    разных коммитов можно сравнивать между собой. С параметром --cold
+    кэши очищаются перед каждым запросом.
+    """
+
+    help = 'Замер производительности маршрутов API.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=100,
+            help='Количество замеряемых запросов в сценарии.',
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=5,
+            help='Количество запросов перед замером.',
+        )
+        parser.add_argument(
+            '--scenario',
+            action='append',
+            help='Запустить только сценарии с этими именами.',
+        )
+        parser.add_argument(
+            '--cold',
+            action='store_true',
+            help='Очищать кэши перед каждым запросом.',
+        )
+        parser.add_argument('--output', help='Файл для результатов в JSON.')
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('Нужна хотя бы одна итерация.')
+        sample = load_sample()
+        if sample is None or sample['unreviewed_title'] is None:
+            raise CommandError(
+                'В базе нет данных для замера. Сначала выполните '
+                'generate_data или csv_to_db.'
+            )
+        scenarios = build_scenarios(sample)
+        if options['scenario']:
+            scenarios = [
+                scenario for scenario in scenarios
+                if scenario.name in options['scenario']
+            ]
+        benchmark = WsgiBenchmark(
+            sample, options['iterations'], options['warmup'], options['cold']
+        )
+        results = []
+        # Письма при регистрации не отправляются, а строки Server-Timing
+        # не пишутся в лог, чтобы не замерять вывод в консоль. Частота
+        # запросов не ограничивается: сценарии повторяют один запрос.
+        timing_logger = logging.getLogger('yamdb.timing')
+        level = timing_logger.level
+        timing_logger.setLevel(logging.WARNING)
+        try:
+            with override_settings(
+                EMAIL_BACKEND='django.core.mail.backends.dummy.EmailBackend',
+                REST_FRAMEWORK={
+                    **settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}
+                },
+            ):
+                for scenario in scenarios:
+                    results.append(benchmark.run(scenario))
+                    self.report(results[-1])
+        finally:
+            timing_logger.setLevel(level)
+        uncovered = sorted(
+            api_route_names() - {scenario.route for scenario in scenarios}
+        )
+        if uncovered and not options['scenario']:
+            self.stdout.write(self.style.WARNING(
+                f'Маршруты без сценариев: {", ".join(uncovered)}'
+            ))
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump({
+                    'meta': self.get_meta(options),
+                    'results': results,
+                    'uncovered': uncovered,
+                }, file, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(
+                f'Результаты записаны в {options["output"]}.'
+            ))
+
+    def report(self, result):
+        self.stdout.write(
+            f'{result["name"]:<20} p50 {result["p50_ms"]:>9.2f} мс  '
+            f'p95 {result["p95_ms"]:>9.2f} мс  '
+            f'p99 {result["p99_ms"]:>9.2f} мс  '
+            f'{result["throughput_rps"]:>8.1f} зап/с  '
+            f'SQL {result["queries"]:>6.1f} / {result["sql_ms"]:.2f} мс'
+        )
+
+    def get_meta(self, options):
+        return {
+            'commit': git_commit(),
+            'created': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'debug': settings.DEBUG,
+            'iterations': options['iterations'],
+            'warmup': options['warmup'],
+            'cold': options['cold'],
+            'rows': {
+                model.__name__: model.objects.count() for model in MODELS_DATA
+            },
+        }
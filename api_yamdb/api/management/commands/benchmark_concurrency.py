@@ -0,0 +1,114 @@
+import json
+import logging
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from api.benchmark import (
+    SAFE_METHODS, ConcurrencyBenchmark, build_scenarios, load_sample
+)
+
+
+class Command(BaseCommand):
+    """Команда, сравнивающая пропускную способность WSGI и ASGI.
+    Использование:
+    1. Сгенерировать данные: python manage.py generate_data.
+    2. Запустить команду: python manage.py benchmark_concurrency
+       --concurrency 64 --client-delay 50.
+    Для каждого сценария чтения анонима выводится число запросов в
+    секунду при одновременных клиентах, читающих ответ с задержкой:
+    WSGI-сервер с --threads потоками против ASGI-сервера.
+    """
+
+    help = 'Сравнение пропускной способности WSGI и ASGI.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=500,
+            help='Количество запросов в сценарии для каждого сервера.',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=32,
+            help='Количество одновременных клиентов.',
+        )
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=8,
+            help='Количество потоков WSGI-сервера.',
+        )
+        parser.add_argument(
+            '--client-delay',
+            type=float,
+            default=50,
+            help='Задержка чтения ответа клиентом в миллисекундах.',
+        )
+        parser.add_argument(
+            '--scenario',
+            action='append',
+            help='Запустить только сценарии с этими именами.',
+        )
+        parser.add_argument('--output', help='Файл для результатов в JSON.')
+
+    def handle(self, *args, **options):
+        if min(
+            options['requests'], options['concurrency'], options['threads']
+        ) < 1:
+            raise CommandError(
+                'Нужен хотя бы один запрос, клиент и поток.'
+            )
+        sample = load_sample()
+        if sample is None or sample['unreviewed_title'] is None:
+            raise CommandError(
+                'В базе нет данных для замера. Сначала выполните '
+                'generate_data или csv_to_db.'
+            )
+        scenarios = [
+            scenario for scenario in build_scenarios(sample)
+            if scenario.method in SAFE_METHODS and scenario.client == 'anon'
+            and (
+                not options['scenario']
+                or scenario.name in options['scenario']
+            )
+        ]
+        benchmark = ConcurrencyBenchmark(
+            sample,
+            options['requests'],
+            options['concurrency'],
+            options['threads'],
+            options['client_delay'] / 1000,
+        )
+        results = []
+        # Как в команде benchmark: без строк Server-Timing в логе и без
+        # ограничения частоты запросов.
+        timing_logger = logging.getLogger('yamdb.timing')
+        level = timing_logger.level
+        timing_logger.setLevel(logging.WARNING)
+        try:
+            with override_settings(REST_FRAMEWORK={
+                **settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}
+            }):
+                for scenario in scenarios:
+                    results.append(benchmark.run(scenario))
+                    self.report(results[-1])
+        finally:
+            timing_logger.setLevel(level)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(
+                    {'results': results}, file, ensure_ascii=False, indent=2
+                )
+            self.stdout.write(self.style.SUCCESS(
+                f'Результаты записаны в {options["output"]}.'
+            ))
+
+    def report(self, result):
+        self.stdout.write(
+            f'{result["name"]:<20} WSGI {result["wsgi_rps"]:>8.1f} зап/с  '
+            f'ASGI {result["asgi_rps"]:>8.1f} зап/с'
+        )
@@ -1,19 +1,275 @@
-from rest_framework import filters
+import hashlib
+import logging
+from time import perf_counter, time_ns
+
+from django.conf import settings
+from django.db import connection
+from django.shortcuts import get_object_or_404
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from rest_framework import filters, status
+from rest_framework.exceptions import APIException
 from rest_framework.mixins import (
     CreateModelMixin,
     DestroyModelMixin,
     ListModelMixin
 )
+from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
+from api.cache import normalize_url, resource_versions
+from core.timing import current_timing, timed
+
+logger = logging.getLogger(__name__)
+
+
+class ResourceVersionsMixin:
+    """Миксин, сообщающий версии ресурсов, от которых зависит ответ.
+    Теги ресурсов возвращает `get_resource_tags`.
+    """
+
+    resource_versions = resource_versions
+    resource_tags = ()
+
+    def get_resource_tags(self):
+        return self.resource_tags
+
+    def get_resource_versions(self):
+        if not hasattr(self, '_resource_versions'):
+            self._resource_versions = self.resource_versions.get(
+                self.get_resource_tags()
+            )
+        return self._resource_versions
+
+
+class ServerTimingMixin:
+    """Хуки жизненного цикла APIView для `ServerTimingMiddleware`:
+    время аутентификации, проверки прав, обработчика без SQL и
+    рендеринга.
+    """
+
+    def perform_authentication(self, request):
+        with timed('auth'):
+            super().perform_authentication(request)
+
+    def check_permissions(self, request):
+        with timed('permissions'):
+            super().check_permissions(request)
+
+    def check_object_permissions(self, request, obj):
+        with timed('permissions'):
+            super().check_object_permissions(request, obj)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        timing = current_timing.get()
+        if timing is not None:
+            timing.start_handler()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        timing = current_timing.get()
+        if timing is not None:
+            timing.finish_handler()
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if timing is not None and isinstance(response, Response):
+            # Ответ DRF рендерится после представления: время считается
+            # от этого хука до post-render callback.
+            started = perf_counter()
+            response.add_post_render_callback(
+                lambda rendered: timing.add('render', perf_counter() - started)
+            )
+        return response
+
+
+class QueryBudgetExceeded(Exception):
+    """Обработчик выполнил больше SQL-запросов, чем разрешено."""
+
+
+class QueryCounter:
+    """Обертка выполнения SQL, считающая запросы."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class QueryBudgetMixin:
+    """Миксин, ограничивающий количество SQL-запросов обработчика.
+    `query_budget` - словарь «действие вьюсета или HTTP-метод: максимум
+    запросов». Для действий без записи в словаре проверка не выполняется.
+    При превышении пишется предупреждение в лог, а при
+    QUERY_BUDGET_STRICT = True (в тестах) выбрасывается исключение.
+    """
+
+    query_budget = {}
+
+    def get_query_budget(self):
+        action = getattr(self, 'action', None) or self.request.method.lower()
+        return self.query_budget.get(action)
+
+    def dispatch(self, request, *args, **kwargs):
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            response = super().dispatch(request, *args, **kwargs)
+        budget = self.get_query_budget()
+        if budget is not None and counter.count > budget:
+            message = (
+                f'{type(self).__name__} {request.method} {request.path}: '
+                f'{counter.count} SQL-запросов при бюджете {budget}.'
+            )
+            if getattr(settings, 'QUERY_BUDGET_STRICT', False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+
+class NestedResourceMixin:
+    """Миксин вложенных маршрутов: родительский объект проверяется по
+    всей цепочке идентификаторов из URL одним запросом и запоминается
+    для сериализатора, классов прав доступа и `perform_create`.
+    `parent_lookups` - пары «поле родителя: аргумент URL».
+    """
+
+    parent_model = None
+    parent_lookups = ()
+
+    @property
+    def parent(self):
+        if not hasattr(self, '_parent'):
+            self._parent = get_object_or_404(
+                self.parent_model,
+                **{
+                    field: self.kwargs[kwarg]
+                    for field, kwarg in self.parent_lookups
+                },
+            )
+        return self._parent
+
+
+class NotModified(APIException):
+    status_code = status.HTTP_304_NOT_MODIFIED
+
+
+def is_not_modified(request, etag, last_modified):
+    """Совпадают ли валидаторы с If-None-Match или If-Modified-Since.
+    Без `last_modified` If-Modified-Since не учитывается.
+    """
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match is not None:
+        etags = {
+            tag[2:] if tag.startswith('W/') else tag
+            for tag in parse_etags(if_none_match)
+        }
+        return '*' in etags or etag[2:] in etags
+    if_modified_since = parse_http_date_safe(
+        request.META.get('HTTP_IF_MODIFIED_SINCE')
+    )
+    return (
+        last_modified is not None
+        and if_modified_since is not None
+        and last_modified <= if_modified_since
+    )
+
+
+class ConditionalGetMixin(ResourceVersionsMixin):
+    """Миксин условных GET-запросов по ETag и Last-Modified.
+    Валидаторы строятся по версиям ресурсов, поэтому при совпадении
+    `If-None-Match` ответ 304 отдается без чтения строк из БД.
+    """
+
+    conditional_actions = ('list', 'retrieve')
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.etag = self.last_modified = None
+        if (
+            request.method not in ('GET', 'HEAD')
+            or self.action not in self.conditional_actions
+        ):
+            return
+        self.etag, self.last_modified = self.get_validators(request)
+        if is_not_modified(request, self.etag, self.last_modified):
+            raise NotModified()
+
+    def get_validators(self, request):
+        """ETag и Last-Modified ответа по версиям его ресурсов.
+        Last-Modified с точностью до секунды отдается, только если эта
+        секунда прошла: иначе изменение в ту же секунду осталось бы
+        незамеченным для If-Modified-Since. Тогда Last-Modified - None.
+        """
+        versions = self.get_resource_versions()
+        digest = hashlib.md5(repr((
+            normalize_url(request),
+            request.META.get('HTTP_ACCEPT'),
+            sorted(versions.items()),
+        )).encode()).hexdigest()
+        last_modified = max(versions.values()) // 10 ** 9
+        if last_modified >= time_ns() // 10 ** 9:
+            last_modified = None
+        return f'W/"{digest}"', last_modified
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(status=exc.status_code)
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if getattr(self, 'etag', None) and response.status_code in (
+            status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED
+        ):
+            response['ETag'] = self.etag
+            if self.last_modified is not None:
+                response['Last-Modified'] = http_date(self.last_modified)
+        return response
+
+
+class CachedListRetrieveMixin(ResourceVersionsMixin):
+    """Миксин, кэширующий ответы list и retrieve в `response_cache`."""
+
+    response_cache = None
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        data = self.response_cache.get(request)
+        if data is not None:
+            return Response(data, headers={'X-Cache': 'HIT'})
+        versions = self.get_resource_versions()
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            self.response_cache.set(request, response.data, versions)
+        response['X-Cache'] = 'MISS'
+        return response
+
 
 class GenericCreateListDestroyMixin(
-    CreateModelMixin, ListModelMixin, DestroyModelMixin, GenericViewSet
+    ServerTimingMixin,
+    QueryBudgetMixin,
+    ConditionalGetMixin,
+    CreateModelMixin,
+    ListModelMixin,
+    DestroyModelMixin,
+    GenericViewSet,
 ):
     """Базовый миксин для Create, List, Destroy операций."""
 
     search_fields = ('name',)
     lookup_field = 'slug'
+    throttle_scope = 'writes'
     filter_backends = (filters.SearchFilter, filters.OrderingFilter)
     ordering_fields = ('name',)
     ordering = ('name',)
+    query_budget = {'list': 3, 'create': 4, 'destroy': 6}
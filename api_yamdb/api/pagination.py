@@ -0,0 +1,126 @@
+import json
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class CursorLimitOffsetPagination(LimitOffsetPagination):
+    """Пагинация limit/offset с опциональным режимом курсора (keyset).
+
+    Режим курсора включается параметром `cursor` (для первой страницы -
+    пустым). Страница выбирается условием по ключу сортировки вьюсета
+    `cursor_ordering` и `id`, поэтому стоимость запроса не зависит
+    от номера страницы, а лишний COUNT(*) не выполняется.
+    """
+
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Некорректный курсор.'
+    tie_breaker = 'id'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = (
+            self.cursor_query_param in request.query_params
+            and getattr(view, 'cursor_ordering', None) is not None
+        )
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+        self.limit = self.get_limit(request)
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.key = view.cursor_ordering.lstrip('-')
+        self.descending = view.cursor_ordering.startswith('-')
+        position, reverse = self.decode_cursor(request, queryset.model)
+
+        descending = self.descending != reverse
+        if position is not None:
+            queryset = queryset.filter(
+                self.get_position_filter(position, descending)
+            )
+        prefix = '-' if descending else ''
+        queryset = queryset.order_by(
+            f'{prefix}{self.key}', f'{prefix}{self.tie_breaker}'
+        )
+        results = list(queryset[:self.limit + 1])
+        has_more = len(results) > self.limit
+        results = results[:self.limit]
+        if reverse:
+            results.reverse()
+
+        self.next_position = self.previous_position = None
+        if results and (reverse or has_more):
+            self.next_position = self.get_position(results[-1])
+        if results and (has_more if reverse else position is not None):
+            self.previous_position = self.get_position(results[0])
+        return results
+
+    def get_position_filter(self, position, descending):
+        """Условие «строго после позиции» с опорой на индекс по ключу."""
+        value, pk = position
+        lookup = 'lt' if descending else 'gt'
+        return Q(**{f'{self.key}__{lookup}e': value}) & (
+            Q(**{f'{self.key}__{lookup}': value})
+            | Q(**{f'{self.tie_breaker}__{lookup}': pk})
+        )
+
+    def get_position(self, instance):
+        value = getattr(instance, self.key)
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        return value, getattr(instance, self.tie_breaker)
+
+    def decode_cursor(self, request, model):
+        """Позиция и направление из курсора. Значения позиции приводятся
+        к типам полей модели, чтобы некорректный курсор не дошел до
+        запроса к БД.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            value, pk, reverse = json.loads(b64decode(encoded.encode()))
+            value = model._meta.get_field(self.key).to_python(value)
+            pk = model._meta.get_field(self.tie_breaker).to_python(pk)
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        if value is None or pk is None:
+            raise NotFound(self.invalid_cursor_message)
+        return (value, pk), bool(reverse)
+
+    def encode_cursor(self, position, reverse):
+        encoded = b64encode(
+            json.dumps((*position, int(reverse))).encode()
+        ).decode()
+        return replace_query_param(
+            remove_query_param(self.base_url, self.offset_query_param),
+            self.cursor_query_param,
+            encoded,
+        )
+
+    def get_next_link(self):
+        if not self.cursor_mode:
+            return super().get_next_link()
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        if not self.cursor_mode:
+            return super().get_previous_link()
+        if self.previous_position is None:
+            return None
+        return self.encode_cursor(self.previous_position, reverse=True)
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
@@ -1,13 +1,24 @@
+from contextlib import nullcontext
+
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.shortcuts import get_object_or_404
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
 from django.utils import timezone
+from django.utils.functional import cached_property
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
 
 from api import const
+from api.slug_cache import category_cache, genre_cache
 from reviews.models import Category, Comment, Genre, Review, Title, User
 
 
+def non_field_error(message):
+    """Ошибка в том же виде, что и из `validate` сериализатора."""
+    return ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [message]})
+
+
 class CategorySerializer(serializers.ModelSerializer):
     """Сериализатор для модели Category."""
 
@@ -54,15 +65,15 @@ class ReviewSerializer(serializers.ModelSerializer):
         )
     )
 
-    def validate(self, data):
-        request = self.context['request']
-        if request.method != 'POST':
-            return data
-        title_id = self.context.get('view').kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
-        if Review.objects.filter(title=title, author=request.user).exists():
-            raise ValidationError('Должен быть только один отзыв.')
-        return data
+    def create(self, validated_data):
+        """Повторный отзыв отклоняет ограничение `unique review`, а не
+        предварительная проверка: она лишний запрос и не защищает от
+        одновременных запросов.
+        """
+        try:
+            return super().create(validated_data)
+        except IntegrityError:
+            raise non_field_error('Должен быть только один отзыв.')
 
     class Meta:
         fields = '__all__'
@@ -76,25 +87,69 @@ class TitleSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Title
-        fields = '__all__'
+        exclude = ('rating_sum', 'rating_count')
+
+
+class CachedSlugRelatedField(serializers.SlugRelatedField):
+    """Поле связи по slug, которое ищет объекты в кэше `slug_cache`."""
+
+    def __init__(self, slug_cache, **kwargs):
+        self.slug_cache = slug_cache
+        super().__init__(slug_field='slug', **kwargs)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            self.fail('invalid')
+        obj = self.slug_cache.get_by_slug(data)
+        if obj is None:
+            self.fail('does_not_exist', slug_name=self.slug_field, value=data)
+        return obj
 
 
 class TitleGetSerializer(TitleSerializer):
-    """Сериализатор модели Title, предназначенный для безопасных методов."""
+    """Сериализатор модели Title, предназначенный для безопасных методов.
+    Категория и жанры берутся из кэша по id, без JOIN с их таблицами.
+    """
+
+    genre = serializers.SerializerMethodField()
+    category = serializers.SerializerMethodField()
+
+    @cached_property
+    def categories(self):
+        return category_cache.load()[0]
 
-    genre = GenreSerializer(many=True, read_only=True)
-    category = CategorySerializer(read_only=True)
+    @cached_property
+    def genres(self):
+        return genre_cache.load()[0]
+
+    def get_category(self, obj):
+        category = self.categories.get(obj.category_id)
+        if category is None:
+            return None
+        return CategorySerializer(category).data
+
+    def get_genre(self, obj):
+        genres = (
+            self.genres.get(genre_title.genre_id)
+            for genre_title in obj.genretitle_set.all()
+        )
+        return GenreSerializer(
+            sorted(filter(None, genres), key=lambda genre: genre.name),
+            many=True,
+        ).data
 
 
 class TitlePostSerializer(TitleSerializer):
     """Сериализатор модели Title, предназначенный для методов POST и PATCH."""
 
-    category = serializers.SlugRelatedField(
-        slug_field='slug', queryset=Category.objects.all(), required=False
+    category = CachedSlugRelatedField(
+        slug_cache=category_cache,
+        queryset=Category.objects.all(),
+        required=False,
     )
 
-    genre = serializers.SlugRelatedField(
-        slug_field='slug', queryset=Genre.objects.all(), many=True
+    genre = CachedSlugRelatedField(
+        slug_cache=genre_cache, queryset=Genre.objects.all(), many=True
     )
 
     def validate_year(self, value):
@@ -170,19 +225,36 @@ class UserSignupSerializer(serializers.Serializer):
         required=True, max_length=const.MAX_LENGTH_EMAIL_FIELD
     )
 
-    def validate(self, data):
-        if User.objects.filter(username=data.get('username')).exists():
-            if User.objects.filter(email=data.get('email')).exists():
-                return data
-            raise ValidationError(
-                'Пользователь с таким именем уже существует.'
-            )
-        if User.objects.filter(email=data.get('email')).exists():
-            raise ValidationError(
-                'Пользователь с таким адресом электронной почты уже '
-                'существует.'
-            )
-        return data
+    def create(self, validated_data):
+        """Создает пользователя или возвращает уже зарегистрированного
+        с теми же `username` и `email`. Занятость полей проверяют
+        ограничения уникальности: пользователи читаются одним запросом,
+        только если вставка не удалась. Точка сохранения нужна лишь
+        внутри транзакции: в режиме autocommit неудачная вставка ее не
+        прерывает.
+        """
+        savepoint = (
+            transaction.atomic() if connection.in_atomic_block
+            else nullcontext()
+        )
+        try:
+            with savepoint:
+                return User.objects.create(**validated_data)
+        except IntegrityError:
+            pass
+        username = validated_data['username']
+        email = validated_data['email']
+        users = User.objects.filter(Q(username=username) | Q(email=email))
+        for user in users:
+            if user.username == username and user.email == email:
+                return user
+            if user.username == username:
+                raise non_field_error(
+                    'Пользователь с таким именем уже существует.'
+                )
+        raise non_field_error(
+            'Пользователь с таким адресом электронной почты уже существует.'
+        )
 
     def validate_username(self, data):
         if data == 'me':
@@ -212,3 +284,15 @@ class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         fields = '__all__'
         model = Comment
+
+
+class AutocompleteSerializer(serializers.Serializer):
+    """Параметры запроса автодополнения."""
+
+    q = serializers.CharField(required=True, trim_whitespace=False)
+    limit = serializers.IntegerField(
+        required=False,
+        min_value=1,
+        max_value=const.AUTOCOMPLETE_MAX_LIMIT,
+        default=const.AUTOCOMPLETE_DEFAULT_LIMIT,
+    )
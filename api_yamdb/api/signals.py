@@ -0,0 +1,174 @@
+from django.db import transaction
+from django.db.models import Subquery
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+
+from api.authentication import bump_token_version, reset_token_version
+from api.autocomplete import autocomplete
+from api.cache import resource_versions
+from reviews.models import (
+    Category, Comment, Genre, GenreTitle, Review, Title, User
+)
+from reviews.signals import bulk_data_changed
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Category)
+def update_autocomplete(sender, instance, **kwargs):
+    transaction.on_commit(lambda: autocomplete.update(instance))
+
+
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Category)
+def remove_from_autocomplete(sender, instance, **kwargs):
+    transaction.on_commit(
+        lambda: autocomplete.update(instance, deleted=True)
+    )
+
+
+def invalidate(*tags):
+    transaction.on_commit(lambda: resource_versions.invalidate(*tags))
+
+
+def invalidate_titles(*title_ids):
+    invalidate('titles', *(f'title:{title_id}' for title_id in title_ids))
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def invalidate_title(sender, instance, **kwargs):
+    invalidate_titles(instance.pk)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_review(sender, instance, **kwargs):
+    invalidate_titles(instance.title_id)
+    invalidate(f'review:{instance.pk}')
+
+
+@receiver(pre_save, sender=Review)
+def remember_review_rating(sender, instance, raw=False, **kwargs):
+    """Запоминает произведение и оценку сохраненного отзыва. Строка
+    блокируется (`Review.save` выполняется в транзакции), поэтому
+    одновременные изменения отзыва не применят разницу дважды.
+    """
+    instance._stored_rating = None
+    if raw or instance.pk is None:
+        return
+    instance._stored_rating = Review.objects.select_for_update().filter(
+        pk=instance.pk
+    ).values_list('title_id', 'score').first()
+
+
+@receiver(post_save, sender=Review)
+def count_review_rating(sender, instance, raw=False, **kwargs):
+    """Учитывает в рейтинге новый отзыв или изменение оценки при любом
+    способе записи.
+    """
+    stored = getattr(instance, '_stored_rating', None)
+    if raw or stored == (instance.title_id, instance.score):
+        return
+    if stored is not None:
+        title_id, score = stored
+        if title_id == instance.title_id:
+            Title.objects.filter(pk=title_id).change_rating(
+                instance.score - score
+            )
+            return
+        Title.objects.filter(pk=title_id).change_rating(-score, -1)
+    Title.objects.filter(pk=instance.title_id).change_rating(
+        instance.score, 1
+    )
+
+
+@receiver(pre_delete, sender=Review)
+def discount_review_rating(sender, instance, **kwargs):
+    """Вычитает оценку из рейтинга при любом удалении отзыва: через API,
+    админку или каскадом при удалении пользователя и произведения.
+    Оценка берется из строки отзыва в БД: объект в памяти мог устареть.
+    """
+    score = Review.objects.filter(pk=instance.pk).values('score')
+    Title.objects.filter(
+        pk=instance.title_id, reviews=instance.pk
+    ).change_rating(-Subquery(score), -1)
+
+
+@receiver(post_save, sender=GenreTitle)
+@receiver(post_delete, sender=GenreTitle)
+def invalidate_genre_title(sender, instance, **kwargs):
+    invalidate_titles(instance.title_id)
+
+
+@receiver(m2m_changed, sender=GenreTitle)
+def invalidate_title_genres(sender, instance, action, reverse, pk_set,
+                            **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        invalidate_titles(instance.pk)
+    elif pk_set:
+        invalidate_titles(*pk_set)
+    else:
+        transaction.on_commit(resource_versions.invalidate_all)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment(sender, instance, **kwargs):
+    invalidate(f'review:{instance.review_id}')
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_categories(sender, **kwargs):
+    invalidate('categories')
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def invalidate_genres(sender, **kwargs):
+    invalidate('genres')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_users(sender, created=False, **kwargs):
+    """Новый пользователь еще не автор, поэтому `authors` не меняется."""
+    if created:
+        invalidate('users')
+    else:
+        invalidate('users', 'authors')
+
+
+@receiver(pre_save, sender=User)
+def revoke_user_tokens(sender, instance, raw=False, update_fields=None,
+                       **kwargs):
+    if not raw:
+        bump_token_version(instance, update_fields)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def reset_user_token_version(sender, instance, created=False, **kwargs):
+    """Версия токенов в кэше сбрасывается при любом изменении
+    пользователя, в том числе при отключении учетной записи.
+    """
+    if not created:
+        reset_token_version(instance.pk)
+
+
+@receiver(bulk_data_changed)
+def invalidate_after_bulk_change(sender, instances=None, **kwargs):
+    """Без списка `instances` сбрасываются все версии ресурсов."""
+    if sender is Title and instances is not None:
+        invalidate('titles')
+        autocomplete.update(*instances)
+        return
+    resource_versions.invalidate_all()
+    if autocomplete.get_section(sender)[0] is not None:
+        autocomplete.bump_version()
@@ -0,0 +1,51 @@
+"""Кэш категорий и жанров в памяти процесса.
+
+Таблицы категорий и жанров маленькие и меняются редко, поэтому они
+целиком загружаются в память и используются для поиска по slug и id
+без запросов к БД. Актуальность проверяется по версии тега ресурса
+(`categories`, `genres`), которую сигналы меняют при создании,
+изменении или удалении объектов.
+"""
+from threading import RLock
+
+from api.cache import resource_versions
+from reviews.models import Category, Genre
+
+
+class SlugCache:
+    """Версионируемый кэш объектов модели с полями name и slug."""
+
+    def __init__(self, model, tag):
+        self.model = model
+        self.tag = tag
+        self._lock = RLock()
+        self._version = None
+        self._by_id = None
+        self._by_slug = None
+
+    def __deepcopy__(self, memo):
+        """Поля сериализаторов копируются, а кэш должен оставаться общим."""
+        return self
+
+    def load(self):
+        """Возвращает актуальные словари объектов по id и по slug."""
+        with self._lock:
+            version = resource_versions.get((self.tag,))
+            if self._by_id is not None and version == self._version:
+                return self._by_id, self._by_slug
+            objects = list(self.model.objects.order_by())
+            self._by_id = {obj.pk: obj for obj in objects}
+            self._by_slug = {obj.slug: obj for obj in objects}
+            self._version = version
+            return self._by_id, self._by_slug
+
+    def get_by_slug(self, slug):
+        return self.load()[1].get(slug)
+
+    def get_by_id(self, pk):
+        return self.load()[0].get(pk)
+
+
+category_cache = SlugCache(Category, 'categories')
+
+genre_cache = SlugCache(Genre, 'genres')
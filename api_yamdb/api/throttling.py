@@ -0,0 +1,120 @@
+"""Ограничение частоты изменяющих запросов по алгоритму token bucket.
+
+У каждого ключа (IP-адрес или пользователь) в общем для процессов кэше
+'throttle' хранится ведро: число оставшихся токенов и время последнего
+обновления. Ведро вмещает N токенов и пополняется со скоростью N за
+период из частоты вида `N/период` (`5/min`), то есть допускает всплеск
+из N запросов. Запись в кэше истекает через период - к этому времени
+ведро было бы полным. Чтение и запись ведра не атомарны, поэтому при
+одновременных запросах с одного ключа изредка проходит лишний запрос.
+
+Область ограничения задает атрибут вьюсета `throttle_scope`, частоты -
+DEFAULT_THROTTLE_RATES с ключами `<область>.ip` и `<область>.user`;
+области без частоты не ограничиваются. Безопасные методы (GET, HEAD,
+OPTIONS) не учитываются. Проверка выполняется в `APIView.initial` до
+обработчика; пользователь берется из claims токена
+(`StatelessJWTAuthentication`), поэтому отклоненный запрос не
+обращается к БД.
+"""
+from math import ceil
+from time import time
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from rest_framework import permissions
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+DURATIONS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+
+# Бэкенды кэша, данные которых видны только своему процессу.
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def parse_rate(rate):
+    """`N/период` -> (емкость ведра, токенов в секунду)."""
+    number, period = rate.split('/')
+    capacity = int(number)
+    return capacity, capacity / DURATIONS[period[0]]
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Базовое ограничение: ключ ведра возвращает `get_ident_key`."""
+
+    cache_alias = 'throttle'
+    kind = None
+
+    def __init__(self):
+        self.wait_time = None
+
+    def get_ident_key(self, request):
+        raise NotImplementedError
+
+    def get_rate(self, view):
+        scope = getattr(view, 'throttle_scope', None)
+        if scope is None:
+            return None
+        return api_settings.DEFAULT_THROTTLE_RATES.get(f'{scope}.{self.kind}')
+
+    def allow_request(self, request, view):
+        if request.method in permissions.SAFE_METHODS:
+            return True
+        rate = self.get_rate(view)
+        ident = self.get_ident_key(request)
+        if rate is None or ident is None:
+            return True
+        capacity, refill = parse_rate(rate)
+        key = f'throttle:{view.throttle_scope}.{self.kind}:{ident}'
+        cache = caches[self.cache_alias]
+        now = time()
+        tokens, updated = cache.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * refill)
+        if tokens < 1:
+            self.wait_time = (1 - tokens) / refill
+            return False
+        cache.set(key, (tokens - 1, now), ceil(capacity / refill))
+        return True
+
+    def wait(self):
+        return self.wait_time
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    """Ведро на IP-адрес клиента (с учетом NUM_PROXIES)."""
+
+    kind = 'ip'
+
+    def get_ident_key(self, request):
+        return self.get_ident(request)
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """Ведро на аутентифицированного пользователя."""
+
+    kind = 'user'
+
+    def get_ident_key(self, request):
+        if request.user.is_authenticated:
+            return request.user.pk
+        return None
+
+
+def check_throttle_cache(app_configs, **kwargs):
+    """Предупреждает, если ведра хранятся в памяти процесса."""
+    backend = settings.CACHES.get(
+        TokenBucketThrottle.cache_alias, {}
+    ).get('BACKEND')
+    if backend not in PROCESS_LOCAL_BACKENDS:
+        return []
+    return [checks.Warning(
+        f'Кэш `{TokenBucketThrottle.cache_alias}` хранит ведра '
+        'ограничения частоты запросов в памяти процесса: при нескольких '
+        'воркерах лимит умножается на их число.',
+        hint='Используйте общий бэкенд: Redis, Memcached или '
+             'FileBasedCache.',
+        id='api.W001',
+    )]
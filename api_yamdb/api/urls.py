@@ -1,6 +1,6 @@
 from api.views import (
-    CategoryViewSet, CommentViewSet, GenreViewSet,
-    GetTokensForUserView, ReviewViewSet, TitleViewSet,
+    AutocompleteView, CategoryViewSet, CommentViewSet,
+    GenreViewSet, GetTokensForUserView, ReviewViewSet, TitleViewSet,
     UserSignupView, UserUpdateView, UserViewSet
 )
 from django.urls import include, path
@@ -27,5 +27,8 @@ urlpatterns = [
     path('v1/auth/token/', GetTokensForUserView.as_view(), name='token'),
     path('v1/auth/signup/', UserSignupView.as_view(), name='signup'),
     path('v1/users/me/', UserUpdateView.as_view(), name='me'),
+    path(
+        'v1/autocomplete/', AutocompleteView.as_view(), name='autocomplete'
+    ),
     path('v1/', include(router.urls)),
 ]
@@ -1,23 +1,35 @@
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db.models import Avg
+from django.db import transaction
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, permissions, status, views, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
 
+from api import const
+from api.authentication import RoleAccessToken
+from api.autocomplete import autocomplete
+from api.cache import title_cache
+from api.export import export_titles
 from api.filters import TitleFilter
-from api.mixins import GenericCreateListDestroyMixin
+from api.mixins import (
+    CachedListRetrieveMixin, ConditionalGetMixin,
+    GenericCreateListDestroyMixin, NestedResourceMixin, QueryBudgetMixin,
+    ServerTimingMixin
+)
 from api.permissions import IsAdmin, IsAuthorOrModeratorOrAdmin
 from api.serializers import (
-    CategorySerializer, CommentSerializer,
+    AutocompleteSerializer, CategorySerializer, CommentSerializer,
     GenreSerializer, GetTokensForUserSerializer,
     ReviewSerializer, TitleGetSerializer,
     TitlePostSerializer, UserSerializer,
     UserSignupSerializer, UserUpdateSerializer
 )
+from core.mail import MailQueueFull, mail_queue
 from reviews.models import Category, Genre, Review, Title, User
+from reviews.signals import bulk_data_changed
 
 ALLOWED_METHODS = ('get', 'post', 'patch', 'delete')
 
@@ -27,6 +39,7 @@ class CategoryViewSet(GenericCreateListDestroyMixin):
 
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    resource_tags = ('categories',)
 
 
 class GenreViewSet(GenericCreateListDestroyMixin):
@@ -34,44 +47,80 @@ class GenreViewSet(GenericCreateListDestroyMixin):
 
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    resource_tags = ('genres',)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(
+    ServerTimingMixin,
+    QueryBudgetMixin,
+    ConditionalGetMixin,
+    NestedResourceMixin,
+    viewsets.ModelViewSet,
+):
     """ViewSet для работы с отзывами."""
 
     serializer_class = ReviewSerializer
+    throttle_scope = 'writes'
     permission_classes = (
         permissions.IsAuthenticatedOrReadOnly,
         IsAuthorOrModeratorOrAdmin,
     )
     http_method_names = ALLOWED_METHODS
-
-    @property
-    def get_title(self):
-        return get_object_or_404(Title, pk=self.kwargs.get('title_id'))
+    cursor_ordering = 'pub_date'
+    parent_model = Title
+    parent_lookups = (('pk', 'title_id'),)
+    query_budget = {
+        'list': 4,
+        'retrieve': 3,
+        'create': 6,
+        'partial_update': 8,
+        'destroy': 10,
+    }
+
+    def get_resource_tags(self):
+        return (f'title:{self.kwargs["title_id"]}', 'authors')
 
     def get_queryset(self):
-        return self.get_title.reviews.select_related('author')
+        return self.parent.reviews.select_related('author')
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, title=self.get_title)
+        serializer.save(author=self.request.user, title=self.parent)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(
+    ServerTimingMixin,
+    QueryBudgetMixin,
+    ConditionalGetMixin,
+    CachedListRetrieveMixin,
+    viewsets.ModelViewSet,
+):
     """ViewSet для работы с произведениями."""
 
     http_method_names = ALLOWED_METHODS
     filter_backends = (filters.OrderingFilter, DjangoFilterBackend)
+    throttle_scope = 'writes'
     filterset_class = TitleFilter
     ordering_fields = ('name',)
     ordering = ('name',)
+    cursor_ordering = 'name'
+    response_cache = title_cache
+    # Удаление каскадно затрагивает отзывы и комментарии, а пакетное
+    # создание делится на вставки по лимиту параметров SQLite, поэтому
+    # их число запросов зависит от данных и бюджетом не ограничено.
+    query_budget = {
+        'list': 6,
+        'retrieve': 5,
+        'create': 12,
+        'partial_update': 12,
+    }
+
+    def get_resource_tags(self):
+        if self.action == 'retrieve':
+            return (f'title:{self.kwargs["pk"]}', 'categories', 'genres')
+        return ('titles', 'categories', 'genres')
 
     def get_queryset(self):
-        return (
-            Title.objects.select_related('category')
-            .prefetch_related('genre')
-            .annotate(rating=Avg('reviews__score'))
-        )
+        return Title.objects.prefetch_related('genretitle_set')
 
     def get_serializer_class(self):
         return (
@@ -80,37 +129,104 @@ class TitleViewSet(viewsets.ModelViewSet):
             else TitlePostSerializer
         )
 
+    @action(
+        detail=False,
+        methods=('get',),
+        permission_classes=(permissions.IsAuthenticated, IsAdmin),
+    )
+    def export(self, request):
+        """Потоковая выгрузка всех произведений в формате NDJSON."""
+        response = StreamingHttpResponse(
+            export_titles(), content_type='application/x-ndjson'
+        )
+        response['Content-Disposition'] = (
+            'attachment; filename="titles.ndjson"'
+        )
+        return response
+
+    @action(detail=False, methods=('post',), url_path='bulk')
+    def bulk_create(self, request):
+        """Пакетное создание произведений из JSON-массива.
+        Некорректные элементы не мешают созданию остальных и
+        возвращаются в `errors` с индексом в исходном массиве.
+        """
+        items = request.data
+        if not isinstance(items, list):
+            raise ValidationError('Ожидается список произведений.')
+        if len(items) > const.MAX_TITLES_BULK_SIZE:
+            raise ValidationError(
+                'Нельзя создать больше '
+                f'{const.MAX_TITLES_BULK_SIZE} произведений за раз.'
+            )
+        serializer = self.get_serializer()
+        valid, errors = [], []
+        for index, item in enumerate(items):
+            try:
+                valid.append((index, serializer.run_validation(item)))
+            except ValidationError as error:
+                errors.append({'index': index, 'errors': error.detail})
+        with transaction.atomic():
+            titles = Title.objects.bulk_create_with_genres(
+                [data for _, data in valid]
+            )
+        if titles:
+            bulk_data_changed.send(sender=Title, instances=titles)
+        return Response(
+            {
+                'created': [
+                    {'index': index, 'id': title.pk}
+                    for (index, _), title in zip(valid, titles)
+                ],
+                'errors': errors,
+            },
+            status=(
+                status.HTTP_201_CREATED if titles
+                else status.HTTP_400_BAD_REQUEST
+            ),
+        )
 
-class UserSignupView(views.APIView):
+
+class UserSignupView(ServerTimingMixin, QueryBudgetMixin, views.APIView):
     """Регистрация нового пользователя."""
 
     serializer_class = UserSignupSerializer
     permission_classes = (permissions.AllowAny,)
+    throttle_scope = 'signup'
+    # Вставка и чтение пользователя; внутри транзакции (замеры benchmark)
+    # неудачная вставка обрамляется точкой сохранения.
+    query_budget = {'post': 5}
 
     def post(self, request):
         serializer = self.serializer_class(data=request.data)
         serializer.is_valid(raise_exception=True)
-        user, created = User.objects.get_or_create(
-            email=serializer.validated_data.get('email'),
-            username=serializer.validated_data.get('username'))
+        user = serializer.save()
         confirmation_code = default_token_generator.make_token(user)
-        send_mail(
-            subject='Confirmation Code',
-            message=(
-                'Send a request with a confirmation code to receive a '
-                f'token\n {confirmation_code}'
-            ),
-            from_email=None,
-            recipient_list=(user.email,)
-        )
+        try:
+            mail_queue.send(
+                subject='Confirmation Code',
+                message=(
+                    'Send a request with a confirmation code to receive a '
+                    f'token\n {confirmation_code}'
+                ),
+                recipient_list=(user.email,),
+            )
+        except MailQueueFull:
+            return Response(
+                {'detail': 'Не удалось отправить письмо, повторите позже.'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class GetTokensForUserView(views.APIView):
+class GetTokensForUserView(
+    ServerTimingMixin, QueryBudgetMixin, views.APIView
+):
     """Получение JWT-токена."""
 
     serializer_class = GetTokensForUserSerializer
     permission_classes = (permissions.AllowAny,)
+    throttle_scope = 'token'
+    query_budget = {'post': 1}
 
     def post(self, request):
         serializer = self.serializer_class(data=request.data)
@@ -123,58 +239,118 @@ class GetTokensForUserView(views.APIView):
                 f'Invalid code for {user} - {confirmation_code}',
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        token = RefreshToken.for_user(user)
-        return Response(
-            {'access': str(token.access_token)}, status=status.HTTP_200_OK
-        )
+        token = RoleAccessToken.for_user(user)
+        return Response({'access': str(token)}, status=status.HTTP_200_OK)
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(
+    ServerTimingMixin,
+    QueryBudgetMixin,
+    ConditionalGetMixin,
+    viewsets.ModelViewSet,
+):
     """Работа со списком пользователей."""
 
     serializer_class = UserSerializer
+    throttle_scope = 'writes'
     permission_classes = (permissions.IsAuthenticated, IsAdmin,)
     filter_backends = (filters.SearchFilter,)
     search_fields = ('username',)
     lookup_field = 'username'
     queryset = User.objects.all()
     http_method_names = ALLOWED_METHODS
-
-
-class UserUpdateView(views.APIView):
+    cursor_ordering = 'username'
+    resource_tags = ('users',)
+    # Удаление пользователя каскадно удаляет его отзывы и комментарии.
+    # Перед сохранением пользователя читаются поля, от которых зависят
+    # его токены (api.authentication.bump_token_version).
+    query_budget = {
+        'list': 3,
+        'retrieve': 2,
+        'create': 4,
+        'partial_update': 5,
+    }
+
+
+class UserUpdateView(ServerTimingMixin, QueryBudgetMixin, views.APIView):
     """Получение и изменение данных своей учетной записи."""
 
     serializer_class = UserUpdateSerializer
+    throttle_scope = 'writes'
     permission_classes = (permissions.IsAuthenticated,)
+    # Версия токенов читается из БД, если ее нет в кэше; перед
+    # сохранением читаются поля, от которых зависят токены.
+    query_budget = {'get': 2, 'patch': 6}
+
+    def get_user(self):
+        """Пользователь со всеми полями: из токена доступа
+        восстанавливаются только поля, нужные для прав доступа.
+        """
+        user = self.request.user
+        if user.get_deferred_fields():
+            user = User.objects.get(pk=user.pk)
+        return user
 
     def get(self, request, format=None):
-        return Response(self.serializer_class(request.user).data)
+        return Response(self.serializer_class(self.get_user()).data)
 
     def patch(self, request, format=None):
         serializer = self.serializer_class(
-            request.user, data=request.data, partial=True
+            self.get_user(), data=request.data, partial=True
         )
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response(serializer.validated_data, status=status.HTTP_200_OK)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+    ServerTimingMixin,
+    QueryBudgetMixin,
+    ConditionalGetMixin,
+    NestedResourceMixin,
+    viewsets.ModelViewSet,
+):
     """ViewSet для работы с комментариями."""
 
     serializer_class = CommentSerializer
+    throttle_scope = 'writes'
     permission_classes = (
         permissions.IsAuthenticatedOrReadOnly,
         IsAuthorOrModeratorOrAdmin,
     )
     http_method_names = ALLOWED_METHODS
-
-    @property
-    def get_review(self):
-        return get_object_or_404(Review, pk=self.kwargs.get('review_id'))
+    cursor_ordering = 'pub_date'
+    parent_model = Review
+    parent_lookups = (('pk', 'review_id'), ('title_id', 'title_id'))
+    query_budget = {
+        'list': 4,
+        'retrieve': 3,
+        'create': 5,
+        'partial_update': 5,
+        'destroy': 5,
+    }
+
+    def get_resource_tags(self):
+        return (f'review:{self.kwargs["review_id"]}', 'authors')
 
     def get_queryset(self):
-        return self.get_review.comments.select_related('author')
+        return self.parent.comments.select_related('author', 'review')
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, review=self.get_review)
+        serializer.save(author=self.request.user, review=self.parent)
+
+
+class AutocompleteView(ServerTimingMixin, QueryBudgetMixin, views.APIView):
+    """Автодополнение названий произведений, жанров и категорий."""
+
+    serializer_class = AutocompleteSerializer
+    permission_classes = (permissions.AllowAny,)
+    query_budget = {'get': 3}
+
+    def get(self, request):
+        serializer = self.serializer_class(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return Response(autocomplete.search(
+            serializer.validated_data['q'],
+            serializer.validated_data['limit'],
+        ))
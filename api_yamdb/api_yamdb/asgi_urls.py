@@ -0,0 +1,9 @@
+from django.urls import include, path
+
+from api.async_views import async_urlpatterns
+from api_yamdb.urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = [
+    path('api/v1/', include(async_urlpatterns())),
+    *sync_urlpatterns,
+]
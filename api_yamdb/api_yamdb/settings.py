@@ -1,3 +1,4 @@
+import os
 from datetime import timedelta
 from pathlib import Path
 
@@ -26,6 +27,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.ServerTimingMiddleware',
+    'core.middleware.MetricsMiddleware',
+    'core.slow_queries.SlowQueryMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -37,6 +41,10 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'api_yamdb.urls'
 
+# Схема URL для сервера ASGI (api_yamdb.asgi): маршруты чтения API
+# обслуживают асинхронные представления из api.async_views.
+ASGI_URLCONF = 'api_yamdb.asgi_urls'
+
 TEMPLATES_DIR = BASE_DIR / 'templates'
 TEMPLATES = [
     {
@@ -65,6 +73,43 @@ DATABASES = {
     }
 }
 
+# Для нескольких процессов нужен общий бэкенд (Redis, Memcached или
+# FileBasedCache): через кэш согласуются версии индексов и тегов.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'yamdb-default',
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+    'responses': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'yamdb-responses',
+        'TIMEOUT': 300,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    # Версии ресурсов (api.cache). Теги берутся из адресов запросов,
+    # поэтому хранятся отдельно от ведер throttling и версий токенов и
+    # с ограниченным временем жизни: заново созданная версия только
+    # делает устаревшими ответы и ETag, собранные по старой.
+    'versions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'yamdb-versions',
+        'TIMEOUT': 3600,
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+    # Ведра ограничения частоты запросов (api.throttling). Кэш общий для
+    # процессов одного сервера: с кэшем в памяти процесса действующий
+    # лимит умножился бы на число воркеров (проверка api.W001). При
+    # нескольких серверах замените на Redis или Memcached.
+    'throttle': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv(
+            'THROTTLE_CACHE_DIR', BASE_DIR / 'throttle_cache'
+        ),
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -101,18 +146,103 @@ REST_FRAMEWORK = {
         'api.permissions.IsAdminOrReadOnly',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.StatelessJWTAuthentication',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.CursorLimitOffsetPagination',
     'PAGE_SIZE': 10,
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
     ],
+    # Ведра токенов (api.throttling) для областей `throttle_scope`
+    # вьюсетов: `<область>.ip` - на IP-адрес, `<область>.user` - на
+    # пользователя. Учитываются только изменяющие запросы.
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.IPTokenBucketThrottle',
+        'api.throttling.UserTokenBucketThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'signup.ip': '5/min',
+        'token.ip': '10/min',
+        'writes.ip': '120/min',
+        'writes.user': '60/min',
+    },
+    # Число прокси перед приложением: IP-адрес клиента берется из
+    # X-Forwarded-For только при NUM_PROXIES > 0, иначе из REMOTE_ADDR.
+    # Без настройки DRF доверяет X-Forwarded-For целиком, и клиент
+    # получает новое ведро, подменяя заголовок.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', 0)),
 }
 
-EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+EMAIL_BACKEND = os.getenv(
+    'EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend'
+)
+EMAIL_FILE_PATH = os.getenv('EMAIL_FILE_PATH', BASE_DIR / 'sent_emails')
 DEFAULT_FROM_EMAIL = 'info@yamdb.lan'
 
+# Очередь писем (core.mail): потоки отправки (0 - синхронная отправка),
+# размер очереди, ожидание места в ней (с), писем на одно соединение,
+# повторы неотправленных писем и начальная задержка повтора (с).
+MAIL_WORKERS = int(os.getenv('MAIL_WORKERS', 2))
+MAIL_QUEUE_SIZE = 1000
+MAIL_QUEUE_TIMEOUT = 0.5
+MAIL_BATCH_SIZE = 50
+MAIL_MAX_RETRIES = 5
+MAIL_RETRY_DELAY = 1
+
+# Запросы дольше порога (мс) с планом выполнения пишутся строками JSON
+# в SLOW_QUERY_LOG_FILE; сводка - команда slow_queries. None отключает.
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv('SLOW_QUERY_THRESHOLD_MS', 100))
+SLOW_QUERY_LOG_FILE = os.getenv(
+    'SLOW_QUERY_LOG_FILE', BASE_DIR / 'slow_queries.log'
+)
+
+# Строки JSON с разбивкой времени запросов (Server-Timing) пишутся
+# в логгер yamdb.timing.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+        'slow_queries': {
+            'class': 'logging.FileHandler',
+            'filename': SLOW_QUERY_LOG_FILE,
+            'encoding': 'utf-8',
+            'delay': True,
+        },
+    },
+    'loggers': {
+        'yamdb.timing': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'yamdb.mail': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+        'yamdb.slow_queries': {
+            'handlers': ['slow_queries'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
+# Каталог, через который воркеры суммируют метрики /metrics. Без него
+# отдаются метрики только обрабатывающего запрос процесса.
+METRICS_DIR = os.getenv('METRICS_DIR')
+METRICS_FLUSH_INTERVAL = 1
+
+# Превышение бюджета SQL-запросов вьюсета (query_budget): предупреждение
+# в лог или, если True, исключение. В тестах включается всегда.
+QUERY_BUDGET_STRICT = False
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=1),
 }
+
+# Размер LRU-кэша проверенных JWT в процессе и время (с) хранения
+# версии токенов пользователя в кэше 'default'.
+VERIFIED_TOKENS_CACHE_SIZE = 4096
+TOKEN_VERSION_CACHE_TIMEOUT = 300
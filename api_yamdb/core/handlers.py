@@ -0,0 +1,63 @@
+"""Обработчик ASGI со своей схемой URL."""
+from tempfile import SpooledTemporaryFile
+
+import django
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.db import connections
+
+# Объем потокового ответа, который хранится в памяти, а не во
+# временном файле.
+SPOOL_MAX_SIZE = 2 ** 20
+
+
+def spool(response):
+    """Читает потоковый ответ во временный файл. Выполняется целиком в
+    одном потоке: генератор ответа может обращаться к ORM и держать
+    транзакцию (выгрузка произведений). Соединения потока закрываются.
+    """
+    body = SpooledTemporaryFile(SPOOL_MAX_SIZE)
+    try:
+        for part in response:
+            body.write(part)
+    except BaseException:
+        body.close()
+        raise
+    finally:
+        connections.close_all()
+    body.seek(0)
+    return body
+
+
+class URLConfASGIHandler(ASGIHandler):
+    """Разрешает адреса запросов ASGI по схеме ASGI_URLCONF, в которой
+    часть маршрутов обслуживают асинхронные представления.
+    """
+
+    def create_request(self, scope, body_file):
+        request, error_response = super().create_request(scope, body_file)
+        if request is not None:
+            request.urlconf = settings.ASGI_URLCONF
+        return request, error_response
+
+    async def send_response(self, response, send):
+        """Django 3.2 перебирает потоковый ответ в цикле событий, где
+        ORM недоступен, поэтому ответ сначала читается в отдельном
+        потоке (не в общем потоке sync_to_async, чтобы долгая выгрузка
+        не задерживала другие запросы).
+        """
+        if not response.streaming:
+            return await super().send_response(response, send)
+        body = await sync_to_async(spool, thread_sensitive=False)(response)
+        with body:
+            response.streaming_content = iter(
+                lambda: body.read(self.chunk_size), b''
+            )
+            await super().send_response(response, send)
+
+
+def get_asgi_application():
+    """Аналог django.core.asgi.get_asgi_application."""
+    django.setup(set_prefix=False)
+    return URLConfASGIHandler()
@@ -0,0 +1,194 @@
+"""Очередь исходящих писем.
+
+`mail_queue.send` ставит письмо в ограниченную очередь процесса и
+сразу возвращает управление. Письма отправляют MAIL_WORKERS потоков:
+каждый забирает из очереди до MAIL_BATCH_SIZE писем и отправляет их
+через одно соединение EMAIL_BACKEND. Неотправленные письма повторяются
+с экспоненциальной задержкой от MAIL_RETRY_DELAY секунд; после
+MAIL_MAX_RETRIES повторов письмо отбрасывается с записью в лог
+yamdb.mail. При MAIL_WORKERS = 0 письма отправляются синхронно.
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+from time import monotonic, sleep
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+
+from core.metrics import Counter, Gauge, registry
+
+logger = logging.getLogger('yamdb.mail')
+
+mail_messages = Counter(
+    registry,
+    'yamdb_mail_messages_total',
+    'Количество исходящих писем по результату попытки отправки.',
+    ('status',),
+)
+
+mail_queue_depth = Gauge(
+    registry,
+    'yamdb_mail_queue_depth',
+    'Количество писем, ожидающих отправки.',
+)
+
+
+class MailQueueFull(Exception):
+    """Очередь писем заполнена: отправка не успевает за потоком писем."""
+
+
+def send_batch(messages):
+    """Отправляет письма через одно соединение и возвращает те,
+    которые отправить не удалось. Ошибка одного письма не мешает
+    отправке остальных.
+    """
+    connection = get_connection()
+    failed = []
+    try:
+        connection.open()
+    except Exception:
+        logger.warning(
+            'Не удалось открыть соединение для %d писем.', len(messages),
+            exc_info=True,
+        )
+        return messages
+    try:
+        for message in messages:
+            try:
+                connection.send_messages([message])
+            except Exception:
+                logger.warning(
+                    'Не удалось отправить письмо: %s.',
+                    ', '.join(message.to), exc_info=True,
+                )
+                failed.append(message)
+    finally:
+        connection.close()
+    mail_messages.inc(len(messages) - len(failed), status='sent')
+    return failed
+
+
+def deliver(messages):
+    """Отправляет письма, повторяя только неотправленные с задержкой."""
+    for attempt in range(settings.MAIL_MAX_RETRIES + 1):
+        if attempt:
+            mail_messages.inc(len(messages), status='retried')
+            sleep(settings.MAIL_RETRY_DELAY * 2 ** (attempt - 1))
+        messages = send_batch(messages)
+        if not messages:
+            return
+    mail_messages.inc(len(messages), status='failed')
+    logger.error(
+        'Письма отброшены после %d повторов: %s.',
+        settings.MAIL_MAX_RETRIES,
+        ', '.join(', '.join(message.to) for message in messages),
+    )
+
+
+class MailQueue:
+    """Ограниченная очередь писем с пулом потоков отправки.
+    Очередь и потоки создаются при первом письме, а в дочернем процессе
+    после fork - заново.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._queue = None
+        self._workers = []
+
+    def depth(self):
+        return 0 if self._queue is None else self._queue.qsize()
+
+    def start(self):
+        with self._lock:
+            if self._queue is None:
+                self._queue = queue.Queue(settings.MAIL_QUEUE_SIZE)
+                for number in range(settings.MAIL_WORKERS):
+                    worker = threading.Thread(
+                        target=self.work,
+                        args=(self._queue,),
+                        name=f'mail-worker-{number}',
+                        daemon=True,
+                    )
+                    worker.start()
+                    self._workers.append(worker)
+        return self._queue
+
+    def send(self, subject, message, recipient_list, from_email=None):
+        """Ставит письмо в очередь; MailQueueFull, если места нет
+        дольше MAIL_QUEUE_TIMEOUT секунд.
+        """
+        email = EmailMessage(subject, message, from_email, recipient_list)
+        if not settings.MAIL_WORKERS:
+            email.send()
+            return
+        try:
+            self.start().put(email, timeout=settings.MAIL_QUEUE_TIMEOUT)
+        except queue.Full:
+            raise MailQueueFull(
+                f'В очереди уже {settings.MAIL_QUEUE_SIZE} писем.'
+            )
+
+    @staticmethod
+    def work(messages):
+        """Цикл потока отправки; None в очереди - сигнал остановки."""
+        while True:
+            batch = [messages.get()]
+            while batch[-1] is not None and (
+                len(batch) < settings.MAIL_BATCH_SIZE
+            ):
+                try:
+                    batch.append(messages.get_nowait())
+                except queue.Empty:
+                    break
+            stop = batch[-1] is None
+            pending = batch[:-1] if stop else batch
+            try:
+                if pending:
+                    deliver(pending)
+            finally:
+                for _ in batch:
+                    messages.task_done()
+            if stop:
+                return
+
+    def join(self):
+        """Ждет отправки всех писем из очереди."""
+        if self._queue is not None:
+            self._queue.join()
+
+    def close(self, timeout=5):
+        """Останавливает потоки, дав им отправить письма из очереди."""
+        with self._lock:
+            messages, workers = self._queue, self._workers
+            self._reset()
+        if messages is None:
+            return
+        deadline = monotonic() + timeout
+        for _ in workers:
+            try:
+                messages.put(None, timeout=max(deadline - monotonic(), 0))
+            except queue.Full:
+                # Очередь заполнена: потоки-демоны завершатся вместе с
+                # процессом, оставшиеся письма будут потеряны.
+                logger.error(
+                    'Очередь писем не освободилась за %s с, в ней '
+                    'осталось %d писем.', timeout, messages.qsize(),
+                )
+                return
+        for worker in workers:
+            worker.join(max(deadline - monotonic(), 0))
+
+
+mail_queue = MailQueue()
+registry.register_callback(
+    mail_queue_depth, lambda: {(): mail_queue.depth()}
+)
+atexit.register(mail_queue.close)
@@ -0,0 +1,92 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+def summarize(records):
+    """Группирует записи журнала по отпечатку запроса."""
+    groups = {}
+    for record in records:
+        group = groups.setdefault(record['fingerprint'], {
+            'fingerprint': record['fingerprint'],
+            'count': 0,
+            'total_ms': 0.0,
+            'max_ms': 0.0,
+            'views': set(),
+            'full_scans': set(),
+            'sql': record['sql'],
+            'plan': record['plan'],
+        })
+        group['count'] += 1
+        group['total_ms'] += record['duration_ms']
+        group['max_ms'] = max(group['max_ms'], record['duration_ms'])
+        if record['view']:
+            group['views'].add(record['view'])
+        group['full_scans'].update(record['full_scans'])
+    for group in groups.values():
+        group['total_ms'] = round(group['total_ms'], 3)
+        group['mean_ms'] = round(group['total_ms'] / group['count'], 3)
+        group['views'] = sorted(group['views'])
+        group['full_scans'] = sorted(group['full_scans'])
+    return sorted(
+        groups.values(), key=lambda group: group['total_ms'], reverse=True
+    )
+
+
+class Command(BaseCommand):
+    """Команда, выводящая самые затратные медленные запросы.
+    Использование:
+    python manage.py slow_queries --top 10.
+    Запросы журнала SLOW_QUERY_LOG_FILE группируются по отпечатку и
+    сортируются по суммарному времени.
+    """
+
+    help = 'Сводка журнала медленных SQL-запросов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--log-file',
+            default=str(settings.SLOW_QUERY_LOG_FILE),
+            help='Файл журнала медленных запросов.',
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=10,
+            help='Количество выводимых запросов.',
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Вывести сводку в формате JSON.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['log_file'], encoding='utf-8') as file:
+                records = [json.loads(line) for line in file if line.strip()]
+        except OSError as error:
+            raise CommandError(f'Не удалось прочитать журнал: {error}')
+        groups = summarize(records)[:options['top']]
+        if options['json']:
+            self.stdout.write(json.dumps(groups, ensure_ascii=False, indent=2))
+            return
+        for number, group in enumerate(groups, start=1):
+            self.stdout.write(self.style.WARNING(
+                f'{number}. {group["fingerprint"]}: {group["count"]} раз, '
+                f'всего {group["total_ms"]} мс, в среднем '
+                f'{group["mean_ms"]} мс, максимум {group["max_ms"]} мс'
+            ))
+            self.stdout.write(f'   {group["sql"]}')
+            if group['views']:
+                self.stdout.write(
+                    f'   Представления: {", ".join(group["views"])}'
+                )
+            if group['full_scans']:
+                self.stdout.write(
+                    '   Полный просмотр таблиц: '
+                    f'{", ".join(group["full_scans"])}'
+                )
+            for line in group['plan'] or ():
+                self.stdout.write(f'   | {line}')
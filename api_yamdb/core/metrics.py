@@ -0,0 +1,317 @@
+"""Метрики в формате Prometheus без внешних зависимостей.
+
+Каждый поток пишет в собственный словарь, поэтому счетчики и
+гистограммы обновляются без блокировок; словари потоков суммируются
+только при сборе. Процессы (воркеры gunicorn) раз в
+METRICS_FLUSH_INTERVAL секунд сохраняют свои значения в файл в каталоге
+METRICS_DIR, а `/metrics` суммирует файлы всех процессов. Файлы
+завершившихся процессов остаются, чтобы счетчики и гистограммы не
+уменьшались; gauge из них не учитываются - это последнее значение
+процесса, а не текущее. Каталог очищается при развертывании. Без
+METRICS_DIR отдаются значения только текущего процесса.
+"""
+import glob
+import json
+import os
+import threading
+import uuid
+from bisect import bisect_left
+from time import monotonic
+
+from django.conf import settings
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+def escape(value):
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace(
+        '"', r'\"'
+    )
+
+
+def format_labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ''
+    return '{' + ','.join(
+        f'{name}="{escape(value)}"' for name, value in pairs
+    ) + '}'
+
+
+class Metric:
+    """Базовый класс метрики с набором меток `labelnames`."""
+
+    type = None
+    # Учитываются ли значения завершившихся процессов.
+    cumulative = True
+
+    def __init__(self, registry, name, documentation, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        registry.register(self)
+
+    def key(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self):
+        return [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.type}',
+        ]
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        values = self.registry.local_values(self.name)
+        key = self.key(labels)
+        values[key] = values.get(key, 0) + amount
+
+    @staticmethod
+    def merge(first, second):
+        return (first or 0) + second
+
+    def render(self, values):
+        return [
+            f'{self.name}{format_labels(self.labelnames, key)} {value}'
+            for key, value in sorted(values.items())
+        ]
+
+
+class Gauge(Counter):
+    """Текущее значение, которое возвращает функция, переданная в
+    `MetricsRegistry.register_callback`. Значения работающих процессов
+    суммируются.
+    """
+
+    type = 'gauge'
+    cumulative = False
+
+
+class Histogram(Metric):
+    """Гистограмма с фиксированными границами корзин.
+    Значение по меткам - список: количество наблюдений в каждой корзине
+    (последняя - +Inf) и сумма наблюдений.
+    """
+
+    type = 'histogram'
+
+    def __init__(self, registry, name, documentation, labelnames=(),
+                 buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        super().__init__(registry, name, documentation, labelnames)
+
+    def observe(self, value, **labels):
+        values = self.registry.local_values(self.name)
+        key = self.key(labels)
+        row = values.get(key)
+        if row is None:
+            row = values[key] = [0] * (len(self.buckets) + 2)
+        row[bisect_left(self.buckets, value)] += 1
+        row[-1] += value
+
+    @staticmethod
+    def merge(first, second):
+        if first is None:
+            return list(second)
+        return [a + b for a, b in zip(first, second)]
+
+    def render(self, values):
+        lines = []
+        for key, row in sorted(values.items()):
+            cumulative = 0
+            bounds = (*(str(bound) for bound in self.buckets), '+Inf')
+            for bound, count in zip(bounds, row):
+                cumulative += count
+                labels = format_labels(self.labelnames, key, (('le', bound),))
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = format_labels(self.labelnames, key)
+            lines.append(f'{self.name}_sum{labels} {row[-1]}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+def process_alive(process_id):
+    """Работает ли процесс `<pid>-<суффикс>` (каталог METRICS_DIR общий
+    для процессов одного сервера).
+    """
+    try:
+        os.kill(int(process_id.split('-')[0]), 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, ValueError):
+        return True
+    return True
+
+
+def read_snapshot(path):
+    """Значения процесса из файла или None, если файл не читается."""
+    try:
+        with open(path, encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+class MetricsRegistry:
+    """Реестр метрик процесса со словарями значений по потокам."""
+
+    def __init__(self):
+        self.metrics = {}
+        self.callbacks = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._reset()
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        """После fork значения родителя не должны учитываться дважды."""
+        self._local = threading.local()
+        self._threads = []
+        self._retired = {}
+        self._flushed = 0.0
+        self.process_id = f'{os.getpid()}-{uuid.uuid4().hex[:8]}'
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+
+    def register_callback(self, metric, function):
+        """`function` возвращает значения метрики процесса при сборе:
+        словарь «кортеж значений меток: значение».
+        """
+        self.callbacks.append((metric, function))
+
+    def local_values(self, name):
+        storage = getattr(self._local, 'storage', None)
+        if storage is None:
+            storage = self._local.storage = {}
+            with self._lock:
+                self._threads.append((threading.current_thread(), storage))
+        values = storage.get(name)
+        if values is None:
+            values = storage[name] = {}
+        return values
+
+    @staticmethod
+    def merge_into(target, metric, values):
+        merged = target.setdefault(metric.name, {})
+        for key, value in list(values.items()):
+            merged[key] = metric.merge(merged.get(key), value)
+
+    def collect(self):
+        """Значения метрик текущего процесса."""
+        result = {}
+        with self._lock:
+            alive = []
+            for thread, storage in self._threads:
+                if thread.is_alive():
+                    alive.append((thread, storage))
+                    continue
+                for name, values in list(storage.items()):
+                    self.merge_into(self._retired, self.metrics[name], values)
+            self._threads = alive
+            storages = [self._retired, *(s for _, s in alive)]
+            for storage in storages:
+                for name, values in list(storage.items()):
+                    self.merge_into(result, self.metrics[name], values)
+        for metric, function in self.callbacks:
+            self.merge_into(result, metric, function())
+        return result
+
+    @property
+    def directory(self):
+        return getattr(settings, 'METRICS_DIR', None)
+
+    def flush(self):
+        """Сохраняет значения процесса в файл для агрегации."""
+        directory = self.directory
+        if directory is None:
+            return
+        data = {
+            name: [[list(key), value] for key, value in values.items()]
+            for name, values in self.collect().items()
+        }
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'{self.process_id}.json')
+        with open(f'{path}.tmp', 'w', encoding='utf-8') as file:
+            json.dump(data, file)
+        os.replace(f'{path}.tmp', path)
+
+    def maybe_flush(self):
+        interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 1)
+        if monotonic() - self._flushed < interval:
+            return
+        if not self._flush_lock.acquire(blocking=False):
+            return
+        try:
+            self._flushed = monotonic()
+            self.flush()
+        finally:
+            self._flush_lock.release()
+
+    def collect_all(self):
+        """Значения, просуммированные по всем процессам; gauge - только
+        по работающим.
+        """
+        directory = self.directory
+        if directory is None:
+            return self.collect()
+        self.flush()
+        result = {}
+        for path in glob.glob(os.path.join(directory, '*.json')):
+            data = read_snapshot(path)
+            if data is None:
+                continue
+            alive = process_alive(os.path.basename(path)[:-len('.json')])
+            for name, rows in data.items():
+                metric = self.metrics.get(name)
+                if metric is not None and (alive or metric.cumulative):
+                    self.merge_into(result, metric, {
+                        tuple(key): value for key, value in rows
+                    })
+        return result
+
+    def render(self):
+        """Текст в формате Prometheus text exposition 0.0.4."""
+        values = self.collect_all()
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.extend(metric.header())
+            lines.extend(metric.render(values.get(name, {})))
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+http_requests = Counter(
+    registry,
+    'yamdb_http_requests_total',
+    'Количество HTTP-запросов.',
+    ('route', 'method', 'status'),
+)
+
+http_request_duration = Histogram(
+    registry,
+    'yamdb_http_request_duration_seconds',
+    'Длительность обработки HTTP-запросов.',
+    ('route', 'method'),
+)
+
+db_queries = Counter(
+    registry,
+    'yamdb_db_queries_total',
+    'Количество SQL-запросов.',
+    ('route',),
+)
+
+db_query_duration = Counter(
+    registry,
+    'yamdb_db_query_duration_seconds_total',
+    'Суммарное время SQL-запросов.',
+    ('route',),
+)
@@ -0,0 +1,107 @@
+import asyncio
+import json
+import logging
+from time import perf_counter
+
+from core.metrics import (
+    db_queries, db_query_duration, http_request_duration, http_requests,
+    registry
+)
+from core.timing import RequestTiming, current_timing
+
+logger = logging.getLogger('yamdb.timing')
+
+
+class AsyncCapableMiddleware:
+    """Основа middleware для WSGI и ASGI. Под ASGI `__call__` возвращает
+    корутину: асинхронные представления выполняются в цикле событий без
+    перехода в поток sync_to_async.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # Признак корутины, как у django.utils.deprecation.MiddlewareMixin.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+
+class ServerTimingMiddleware(AsyncCapableMiddleware):
+    """Добавляет к ответу заголовок Server-Timing и пишет в лог строку
+    JSON с разбивкой времени запроса по этапам.
+    Должен стоять первым в MIDDLEWARE, чтобы общее время включало
+    остальные middleware.
+    """
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        timing = RequestTiming()
+        token = current_timing.set(timing)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timing.reset(token)
+        return self.finish(request, response, timing)
+
+    async def __acall__(self, request):
+        timing = RequestTiming()
+        token = current_timing.set(timing)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timing.reset(token)
+        return self.finish(request, response, timing)
+
+    def finish(self, request, response, timing):
+        timing.total = perf_counter() - timing.started
+        response['Server-Timing'] = timing.header()
+        if logger.isEnabledFor(logging.INFO):
+            match = request.resolver_match
+            logger.info(json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'route': match.view_name if match else None,
+                'status': response.status_code,
+                **timing.as_dict(),
+            }))
+        return response
+
+
+class MetricsMiddleware(AsyncCapableMiddleware):
+    """Записывает метрики запросов по имени маршрута DRF.
+    Стоит после ServerTimingMiddleware: количество и время SQL берутся
+    из замера текущего запроса.
+    """
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        started = perf_counter()
+        response = self.get_response(request)
+        return self.finish(request, response, started)
+
+    async def __acall__(self, request):
+        started = perf_counter()
+        response = await self.get_response(request)
+        return self.finish(request, response, started)
+
+    def finish(self, request, response, started):
+        duration = perf_counter() - started
+        match = request.resolver_match
+        route = match.view_name if match else 'unmatched'
+        http_requests.inc(
+            route=route, method=request.method, status=response.status_code
+        )
+        http_request_duration.observe(
+            duration, route=route, method=request.method
+        )
+        timing = current_timing.get()
+        if timing is not None:
+            db_queries.inc(timing.queries, route=route)
+            db_query_duration.inc(timing.db_time, route=route)
+        registry.maybe_flush()
+        return response
@@ -0,0 +1,35 @@
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from core.slow_queries import slow_query_logger
+from core.timing import record_query
+
+
+@receiver(connection_created)
+def enable_sqlite_wal(sender, connection, **kwargs):
+    """Включает журнал WAL: читатели видят снимок БД и не блокируют
+    запись, что важно для долгих транзакций чтения (выгрузки).
+    """
+    if connection.vendor == 'sqlite':
+        # Через соединение DB-API: служебный запрос не должен попадать
+        # в обертки (бюджет запросов представления, замеры).
+        connection.connection.execute('PRAGMA journal_mode=WAL')
+
+
+def install_wrapper(connection, wrapper):
+    """Добавляет обертку SQL соединения первой в список. Соединение
+    может открыться внутри `connection.execute_wrapper()`, который при
+    выходе снимает последнюю обертку списка.
+    """
+    if wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, wrapper)
+
+
+@receiver(connection_created)
+def install_slow_query_logger(sender, connection, **kwargs):
+    install_wrapper(connection, slow_query_logger)
+
+
+@receiver(connection_created)
+def install_query_timing(sender, connection, **kwargs):
+    install_wrapper(connection, record_query)
@@ -0,0 +1,123 @@
+"""Журнал медленных SQL-запросов с планом выполнения.
+
+Обертка `slow_query_logger` подключается ко всем соединениям с БД
+(см. core.signals). Запрос дольше SLOW_QUERY_THRESHOLD_MS
+записывается строкой JSON в логгер yamdb.slow_queries вместе с
+выводом EXPLAIN QUERY PLAN, представлением, которое его выполнило,
+и отпечатком - текстом запроса без значений. Полные просмотры таблиц
+(`SCAN <таблица>`, в том числе по индексу - без поиска по ключу)
+вынесены в поле `full_scans`.
+Сводку по журналу строит команда slow_queries.
+"""
+import hashlib
+import json
+import logging
+import re
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.conf import settings
+from django.db import DatabaseError
+
+from core.middleware import AsyncCapableMiddleware
+
+logger = logging.getLogger('yamdb.slow_queries')
+
+current_request = ContextVar('current_request', default=None)
+
+EXPLAINABLE = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH')
+
+MAX_PARAMS_LENGTH = 500
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+PLACEHOLDER_LIST = re.compile(r'\((?:\s*%s\s*,)+\s*%s\s*\)')
+WHITESPACE = re.compile(r'\s+')
+FULL_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)')
+
+
+def normalize(sql):
+    """Текст запроса без значений: литералы и списки IN (...) схлопнуты."""
+    sql = STRING_LITERAL.sub('%s', sql)
+    sql = NUMBER_LITERAL.sub('%s', sql)
+    sql = PLACEHOLDER_LIST.sub('(...)', sql)
+    return WHITESPACE.sub(' ', sql).strip()
+
+
+def fingerprint(sql):
+    return hashlib.md5(normalize(sql).encode()).hexdigest()[:16]
+
+
+def explain(connection, sql, params):
+    """План запроса через отдельный курсор без оберток соединения."""
+    if not sql.lstrip().upper().startswith(EXPLAINABLE):
+        return None
+    prefix = (
+        'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+    )
+    cursor = connection.create_cursor()
+    try:
+        cursor.execute(prefix + sql, params)
+        return [str(row[-1]) for row in cursor.fetchall()]
+    except DatabaseError:
+        return None
+    finally:
+        cursor.close()
+
+
+def full_scans(plan):
+    return sorted({
+        match.group(1)
+        for match in map(FULL_SCAN.match, plan or ())
+        if match
+    })
+
+
+def view_name(request):
+    """Маршрут и представление запроса, выполнившего SQL."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None
+    return f'{match.view_name} ({match._func_path})'
+
+
+def slow_query_logger(execute, sql, params, many, context):
+    started = perf_counter()
+    result = execute(sql, params, many, context)
+    duration = perf_counter() - started
+    threshold = getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', None)
+    if threshold is None or duration * 1000 < threshold:
+        return result
+    plan = None if many else explain(context['connection'], sql, params)
+    logger.warning(json.dumps({
+        'duration_ms': round(duration * 1000, 3),
+        'fingerprint': fingerprint(sql),
+        'view': view_name(current_request.get()),
+        'sql': sql,
+        'params': repr(params)[:MAX_PARAMS_LENGTH],
+        'plan': plan,
+        'full_scans': full_scans(plan),
+    }, ensure_ascii=False))
+    return result
+
+
+class SlowQueryMiddleware(AsyncCapableMiddleware):
+    """Запоминает запрос для журнала медленных запросов; представление
+    определяется по нему в момент записи, без хука process_view.
+    """
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        token = current_request.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            current_request.reset(token)
+
+    async def __acall__(self, request):
+        token = current_request.set(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            current_request.reset(token)
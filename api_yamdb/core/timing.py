@@ -0,0 +1,96 @@
+"""Разбивка времени обработки запроса по этапам.
+
+Замер текущего запроса хранится в contextvar: его заполняют
+`ServerTimingMiddleware` (общее время), обертка SQL `record_query`
+и хуки жизненного цикла DRF из `api.mixins.ServerTimingMixin`
+(аутентификация, права доступа, сериализация, рендеринг).
+Contextvar доступен и в потоках sync_to_async, поэтому под ASGI
+учитываются запросы к БД из любого потока. Вне запроса `timed` и
+`record_query` ничего не делают.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+
+current_timing = ContextVar('current_timing', default=None)
+
+
+class RequestTiming:
+    """Длительности этапов одного запроса в секундах."""
+
+    def __init__(self):
+        self.durations = {}
+        self.queries = 0
+        self.db_time = 0.0
+        self.total = 0.0
+        self.started = perf_counter()
+        self._handler = None
+
+    def add(self, name, seconds):
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+    def record_query(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += perf_counter() - started
+
+    def start_handler(self):
+        self._handler = (perf_counter(), self.db_time)
+
+    def finish_handler(self):
+        """Время обработчика без SQL - в основном работа сериализаторов."""
+        if self._handler is None:
+            return
+        started, db_time = self._handler
+        self._handler = None
+        self.add(
+            'serialize', perf_counter() - started - (self.db_time - db_time)
+        )
+
+    def as_dict(self):
+        result = {
+            f'{name}_ms': round(seconds * 1000, 3)
+            for name, seconds in self.durations.items()
+        }
+        result.update(
+            db_ms=round(self.db_time * 1000, 3),
+            db_queries=self.queries,
+            total_ms=round(self.total * 1000, 3),
+        )
+        return result
+
+    def header(self):
+        metrics = [
+            f'{name};dur={seconds * 1000:.3f}'
+            for name, seconds in self.durations.items()
+        ]
+        metrics.append(
+            f'db;dur={self.db_time * 1000:.3f};desc="{self.queries} queries"'
+        )
+        metrics.append(f'total;dur={self.total * 1000:.3f}')
+        return ', '.join(metrics)
+
+
+def record_query(execute, sql, params, many, context):
+    """Обертка выполнения SQL для всех соединений (см. core.signals)."""
+    timing = current_timing.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+    return timing.record_query(execute, sql, params, many, context)
+
+
+@contextmanager
+def timed(name):
+    """Добавляет длительность блока к этапу `name` текущего запроса."""
+    timing = current_timing.get()
+    if timing is None:
+        yield
+        return
+    started = perf_counter()
+    try:
+        yield
+    finally:
+        timing.add(name, perf_counter() - started)
@@ -11,3 +11,9 @@ REVIEW_TEXT_MAX_LENGTH = 100
 MINIMUM_RATING = 1
 
 MAXIMUM_RATING = 10
+
+TITLE_SEARCH_TABLE = 'reviews_title_fts'
+
+TITLE_SEARCH_NAME_WEIGHT = 10.0
+
+TITLE_SEARCH_DESCRIPTION_WEIGHT = 1.0
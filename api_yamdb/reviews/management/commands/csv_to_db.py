@@ -1,9 +1,24 @@
 import csv
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+from itertools import islice
+from multiprocessing import Manager
 
+import django
+from django.apps import apps
 from django.conf import settings
-from django.core.management.base import BaseCommand
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models, transaction
+from django.utils.dateparse import parse_datetime
 
 from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.signals import bulk_data_changed
 
 MODELS_DATA = {
     User: 'users.csv',
@@ -21,35 +36,290 @@ FIELDS_TO_CHANGE = {
     Comment: ['author', 'author_id'],
 }
 
+LOAD_STAGES = (
+    (User, Category, Genre),
+    (Title,),
+    (Review, Title.genre.through),
+    (Comment,),
+)
+
+DEFAULT_BATCH_SIZE = 5000
+
+QUEUE_SIZE = 4
+
+PROGRESS_INTERVAL = 1
+
+
+def rename_field(model, field_from_csv):
+    if model not in FIELDS_TO_CHANGE:
+        return field_from_csv
+    return field_from_csv.replace(*FIELDS_TO_CHANGE[model])
+
+
+def to_python(field, value):
+    """Приводит значение из CSV к типу поля модели."""
+    if value is None or value == '' and field.null:
+        return None
+    try:
+        return field.to_python(value)
+    except ValidationError:
+        parsed = parse_datetime(value)
+        if parsed is None or not isinstance(field, models.DateField):
+            raise
+        return parsed.date()
+
+
+def convert_row(fields, row, path, line):
+    """Приводит строку CSV к типам полей; строки с числом значений,
+    отличным от числа столбцов заголовка, отклоняются.
+    """
+    if len(row) != len(fields):
+        raise CommandError(
+            f'{os.path.basename(path)}, строка {line}: ожидалось '
+            f'{len(fields)} значений, получено {len(row)}.'
+        )
+    return tuple(map(to_python, fields, row))
+
+
+def content_hash(values):
+    """Хэш содержимого строки, не зависящий от представления дат."""
+    normalized = []
+    for value in values:
+        if isinstance(value, datetime):
+            value = value.astimezone(timezone.utc).isoformat()
+        elif isinstance(value, date):
+            value = value.isoformat()
+        normalized.append(value)
+    return hashlib.blake2b(repr(normalized).encode()).digest()
+
+
+def split_batch(model, batch, fields):
+    """Делит пакет объектов на новые, измененные и неизмененные."""
+    attnames = [field.attname for field in fields]
+    pk_index = attnames.index(model._meta.pk.attname)
+    hashes = {
+        obj.pk: content_hash([getattr(obj, name) for name in attnames])
+        for obj in batch
+    }
+    existing = {
+        row[pk_index]: content_hash(row)
+        for row in model.objects.filter(
+            pk__in=hashes
+        ).order_by().values_list(*attnames)
+    }
+    new, changed, unchanged = [], [], []
+    for obj in batch:
+        if obj.pk not in existing:
+            new.append(obj)
+        elif existing[obj.pk] != hashes[obj.pk]:
+            changed.append(obj)
+        else:
+            unchanged.append(obj)
+    return new, changed, unchanged
+
+
+@contextmanager
+def values_from_csv(model):
+    """Отключает auto_now_add, чтобы даты брались из CSV, а повторная
+    синхронизация не находила в них отличий.
+    """
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def batches(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def parse_csv(label, path, batch_size, queue):
+    """Разбирает CSV-файл в процессе пула.
+    В очередь передаются имена атрибутов модели, затем пакеты строк,
+    приведенных к типам полей, и в конце - None.
+    """
+    try:
+        if not apps.ready:
+            django.setup()
+        model = apps.get_model(label)
+        with open(path, encoding='utf-8', newline='') as file:
+            reader = csv.reader(file)
+            header = next(reader, None)
+            if header is None:
+                return
+            fields = [
+                model._meta.get_field(rename_field(model, name))
+                for name in header
+            ]
+            queue.put([field.attname for field in fields])
+            # Номер строки файла, на которой закончилась запись CSV.
+            records = ((reader.line_num, row) for row in reader if row)
+            for rows in batches(records, batch_size):
+                queue.put([
+                    convert_row(fields, row, path, line)
+                    for line, row in rows
+                ])
+    finally:
+        queue.put(None)
+
+
+def receive(queue, future):
+    """Читает сообщения из очереди до конца файла и пробрасывает
+    исключение, возникшее в процессе пула.
+    """
+    while (message := queue.get()) is not None:
+        yield message
+    future.result()
+
+
+def build_batches(model, messages):
+    """Возвращает имена атрибутов и пакеты объектов модели."""
+    attnames = next(messages, None)
+    if attnames is None:
+        return [], iter(())
+    return attnames, (
+        [model(**dict(zip(attnames, row))) for row in rows]
+        for rows in messages
+    )
+
 
 class Command(BaseCommand):
-    """Команда, позволяющая загрузить данные из CSV-файлов в БД.
+    """Команда, позволяющая загрузить данные из CSV-файлов в БД.
     Использование:
     1. Очистить текущую базу данных.
     2. Применить миграции.
     3. Запустить команду: python manage.py csv_to_db.
+    Файлы разбираются параллельно в пуле из --workers процессов и
+    передаются пакетами по --batch-size строк через очереди ограниченного
+    размера, поэтому объем памяти не зависит от размера файлов. Вставка
+    выполняется по этапам LOAD_STAGES в порядке внешних ключей: пока
+    загружаются пользователи, следующие файлы уже разбираются.
+    С параметром --upsert очищать базу не нужно: строки сопоставляются
+    с существующими по первичному ключу, новые добавляются, измененные
+    обновляются, а совпадающие по хэшу содержимого пропускаются.
     """
 
-    help = 'Загрузка данных в базу данных из CSV-файлов.'
+    help = 'Загрузка данных в базу данных из CSV-файлов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--data-dir',
+            default=f'{settings.BASE_DIR}/static/data',
+            help='Каталог с CSV-файлами.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Количество строк в одной пакетной вставке.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=min(len(MODELS_DATA), os.cpu_count() or 1),
+            help='Количество процессов для разбора CSV-файлов.',
+        )
+        parser.add_argument(
+            '--upsert',
+            action='store_true',
+            help='Добавить новые и обновить измененные строки.',
+        )
 
     def handle(self, *args, **options):
-        for model, csv_file in MODELS_DATA.items():
-            with open(
-                    f'{settings.BASE_DIR}/static/data/{csv_file}', 'r',
-                    encoding="utf-8",
-            ) as file:
-                reader = csv.DictReader(file)
-                records = []
-                for row in reader:
-                    if model in FIELDS_TO_CHANGE:
-                        row = {
-                            field_from_csv.replace(
-                                FIELDS_TO_CHANGE[model][0],
-                                FIELDS_TO_CHANGE[model][1]): field_to_table for
-                            field_from_csv, field_to_table in row.items()
-                        }
-                    records.append(model(**row))
-            model.objects.bulk_create(records)
-            self.stdout.write(self.style.SUCCESS(
-                f'Данные объекта {model.__name__} загружены.'
-            ))
+        batch_size = options['batch_size']
+        with ProcessPoolExecutor(options['workers']) as executor, \
+                Manager() as manager:
+            jobs = {}
+            for model in (model for stage in LOAD_STAGES for model in stage):
+                queue = manager.Queue(QUEUE_SIZE)
+                future = executor.submit(
+                    parse_csv,
+                    model._meta.label,
+                    os.path.join(options['data_dir'], MODELS_DATA[model]),
+                    batch_size,
+                    queue,
+                )
+                jobs[model] = receive(queue, future)
+            for stage in LOAD_STAGES:
+                for model in stage:
+                    self.load_model(model, jobs[model], options['upsert'])
+        call_command('rebuild_ratings', stdout=self.stdout)
+
+    def load_model(self, model, messages, upsert):
+        """Загружает или синхронизирует данные модели. В обоих режимах
+        даты берутся из CSV: иначе первая синхронизация после обычной
+        загрузки обновила бы все отзывы и комментарии.
+        """
+        attnames, records = build_batches(model, messages)
+        with values_from_csv(model):
+            if upsert:
+                self.upsert(model, attnames, records)
+            else:
+                self.load(model, records)
+        bulk_data_changed.send(sender=model)
+
+    def load(self, model, records):
+        started = reported = time.monotonic()
+        loaded = 0
+        with transaction.atomic():
+            for batch in records:
+                model.objects.bulk_create(batch)
+                loaded += len(batch)
+                now = time.monotonic()
+                if now - reported >= PROGRESS_INTERVAL:
+                    reported = now
+                    self.report_progress(model, loaded, now - started)
+        self.stdout.write(self.style.SUCCESS(
+            f'Данные объекта {model.__name__} загружены: {loaded} строк, '
+            f'{self.rate(loaded, time.monotonic() - started)} строк/с.'
+        ))
+
+    def upsert(self, model, attnames, records):
+        started = reported = time.monotonic()
+        fields = [model._meta.get_field(name) for name in attnames]
+        update_fields = [
+            field.name for field in fields if not field.primary_key
+        ]
+        created = updated = skipped = 0
+        with transaction.atomic():
+            for batch in records:
+                new, changed, unchanged = split_batch(model, batch, fields)
+                model.objects.bulk_create(new)
+                if changed and update_fields:
+                    model.objects.bulk_update(changed, update_fields)
+                created += len(new)
+                updated += len(changed)
+                skipped += len(unchanged)
+                now = time.monotonic()
+                if now - reported >= PROGRESS_INTERVAL:
+                    reported = now
+                    self.report_progress(
+                        model, created + updated + skipped, now - started
+                    )
+        rate = self.rate(
+            created + updated + skipped, time.monotonic() - started
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Данные объекта {model.__name__} синхронизированы: '
+            f'добавлено {created}, обновлено {updated}, '
+            f'без изменений {skipped}, {rate} строк/с.'
+        ))
+
+    def report_progress(self, model, loaded, elapsed):
+        self.stdout.write(
+            f'{model.__name__}: {loaded} строк, '
+            f'{self.rate(loaded, elapsed)} строк/с'
+        )
+
+    @staticmethod
+    def rate(loaded, elapsed):
+        return round(loaded / elapsed) if elapsed else loaded
@@ -0,0 +1,371 @@
+import csv
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from reviews import const
+from reviews.management.commands.csv_to_db import (
+    DEFAULT_BATCH_SIZE, LOAD_STAGES, MODELS_DATA, batches, rename_field,
+    values_from_csv
+)
+from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.signals import bulk_data_changed
+from users import const as users_const
+
+HEADERS = {
+    User: ('id', 'username', 'email', 'role', 'bio', 'first_name',
+           'last_name'),
+    Category: ('id', 'name', 'slug'),
+    Genre: ('id', 'name', 'slug'),
+    Title: ('id', 'name', 'year', 'category'),
+    Review: ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+    Title.genre.through: ('id', 'title_id', 'genre_id'),
+    Comment: ('id', 'review_id', 'text', 'author', 'pub_date'),
+}
+
+WORDS = (
+    'фильм', 'книга', 'сюжет', 'герой', 'финал', 'автор', 'история',
+    'музыка', 'актер', 'сцена', 'отличный', 'скучный', 'неожиданный',
+    'сильный', 'слабый', 'добрый', 'мрачный', 'смешной', 'долгий',
+    'яркий', 'советую', 'пересмотрю', 'не', 'очень', 'совсем', 'и', 'но',
+)
+
+SCORE_WEIGHTS = (1, 1, 2, 3, 5, 8, 12, 16, 14, 10)
+
+# Оценка с нужными частотами выбирается одним обращением по индексу.
+SCORES = tuple(
+    score
+    for score, weight in zip(
+        range(const.MINIMUM_RATING, const.MAXIMUM_RATING + 1),
+        SCORE_WEIGHTS,
+    )
+    for _ in range(weight)
+)
+
+ROLE_WEIGHTS = {
+    users_const.ROLE_USER: 980,
+    users_const.ROLE_MODERATOR: 18,
+    users_const.ROLE_ADMIN: 2,
+}
+
+FIRST_YEAR = 1950
+
+FIRST_PUBLISHED = datetime(2015, 1, 1, tzinfo=timezone.utc)
+
+PUB_DATE_DAYS = 3650
+
+COMMENT_DELAY_SECONDS = 30 * 24 * 60 * 60
+
+MAX_GENRES_PER_TITLE = 3
+
+TEXT_POOL_SIZE = 4096
+
+
+def zipf_counts(total, size, exponent, cap):
+    """Распределяет total элементов по size рангам по закону Ципфа.
+    Округление ведется по накопленной сумме, поэтому сумма точна;
+    превышение cap переносится на следующие ранги.
+    """
+    weights = [rank ** -exponent for rank in range(1, size + 1)]
+    scale = total / sum(weights)
+    counts = []
+    cumulative = 0.0
+    previous = carry = 0
+    for weight in weights:
+        cumulative += weight * scale
+        current = round(cumulative)
+        count = current - previous + carry
+        previous = current
+        counts.append(min(count, cap))
+        carry = count - counts[-1]
+    for rank in range(size):
+        if not carry:
+            break
+        added = min(cap - counts[rank], carry)
+        counts[rank] += added
+        carry -= added
+    return counts
+
+
+def coprime_step(rng, modulus):
+    """Шаг обхода, при котором (start + i * step) % modulus не повторяется."""
+    if modulus == 1:
+        return 1
+    while True:
+        step = rng.randrange(1, modulus)
+        if math.gcd(step, modulus) == 1:
+            return step
+
+
+class DataGenerator:
+    """Генератор строк таблиц с воспроизводимыми по seed данными.
+    Популярность произведений по числу отзывов подчиняется закону
+    Ципфа, авторы отзывов на одно произведение не повторяются.
+    Каждый метод лениво выдает кортежи в порядке полей HEADERS.
+    """
+
+    def __init__(self, users, categories, genres, titles, reviews,
+                 comments_per_review, exponent, seed):
+        self.users = users
+        self.categories = categories
+        self.genres = genres
+        self.titles = titles
+        self.reviews = reviews
+        self.comments_per_review = comments_per_review
+        self.exponent = exponent
+        self.seed = seed
+        self.this_year = date.today().year
+
+    def rng(self, model):
+        """Отдельный генератор на таблицу: файлы не зависят друг от друга."""
+        return random.Random(f'{self.seed}:{model._meta.label}')
+
+    def text_pool(self, rng, max_length):
+        """Готовые тексты: сборка текста на каждую строку слишком долгая."""
+        return [
+            ' '.join(
+                rng.choices(WORDS, k=rng.randint(3, 20))
+            )[:max_length].strip().capitalize()
+            for _ in range(TEXT_POOL_SIZE)
+        ]
+
+    def rows(self, model):
+        return {
+            User: self.user_rows,
+            Category: self.category_rows,
+            Genre: self.genre_rows,
+            Title: self.title_rows,
+            Review: self.review_rows,
+            Title.genre.through: self.genre_title_rows,
+            Comment: self.comment_rows,
+        }[model]()
+
+    def user_rows(self):
+        rng = self.rng(User)
+        roles = rng.choices(
+            list(ROLE_WEIGHTS), list(ROLE_WEIGHTS.values()), k=self.users
+        )
+        for pk, role in enumerate(roles, start=1):
+            yield (pk, f'user{pk}', f'user{pk}@yamdb.fake', role, '', '', '')
+
+    def category_rows(self):
+        for pk in range(1, self.categories + 1):
+            yield pk, f'Категория {pk}', f'category-{pk}'
+
+    def genre_rows(self):
+        for pk in range(1, self.genres + 1):
+            yield pk, f'Жанр {pk}', f'genre-{pk}'
+
+    def title_rows(self):
+        rng = self.rng(Title)
+        for pk in range(1, self.titles + 1):
+            name = ' '.join(rng.choices(WORDS, k=rng.randint(1, 4)))
+            yield (
+                pk,
+                f'{name.capitalize()} {pk}',
+                rng.randint(FIRST_YEAR, self.this_year),
+                rng.randint(1, self.categories) if self.categories else None,
+            )
+
+    def genre_title_rows(self):
+        if not self.genres:
+            return
+        rng = self.rng(Title.genre.through)
+        pk = 0
+        for title_id in range(1, self.titles + 1):
+            count = rng.randint(1, min(MAX_GENRES_PER_TITLE, self.genres))
+            for genre_id in rng.sample(range(1, self.genres + 1), count):
+                pk += 1
+                yield pk, title_id, genre_id
+
+    def review_rows(self):
+        rng = self.rng(Review)
+        title_ids = list(range(1, self.titles + 1))
+        rng.shuffle(title_ids)
+        counts = zipf_counts(
+            self.reviews, self.titles, self.exponent, self.users
+        )
+        texts = self.text_pool(rng, const.REVIEW_TEXT_MAX_LENGTH)
+        dates = [
+            FIRST_PUBLISHED.date() + timedelta(days=days)
+            for days in range(PUB_DATE_DAYS)
+        ]
+        # Индексы через random() в несколько раз быстрее randrange().
+        random_ = rng.random
+        pk = 0
+        for title_id, count in zip(title_ids, counts):
+            start = rng.randrange(self.users)
+            step = coprime_step(rng, self.users)
+            for number in range(count):
+                pk += 1
+                yield (
+                    pk,
+                    title_id,
+                    texts[int(random_() * TEXT_POOL_SIZE)],
+                    (start + number * step) % self.users + 1,
+                    SCORES[int(random_() * len(SCORES))],
+                    dates[int(random_() * PUB_DATE_DAYS)],
+                )
+
+    def comment_rows(self):
+        if not self.comments_per_review:
+            return
+        rng = self.rng(Comment)
+        texts = self.text_pool(rng, const.MAX_LENGTH_FIELD)
+        # Геометрическое распределение на {0, 1, ...} со средним
+        # comments_per_review.
+        log_failure = math.log(
+            self.comments_per_review / (self.comments_per_review + 1)
+        )
+        random_ = rng.random
+        pk = 0
+        for review_id in range(1, self.reviews + 1):
+            count = int(math.log(1.0 - random_()) / log_failure)
+            published = FIRST_PUBLISHED + timedelta(
+                days=int(random_() * PUB_DATE_DAYS)
+            )
+            for _ in range(count):
+                pk += 1
+                yield (
+                    pk,
+                    review_id,
+                    texts[int(random_() * TEXT_POOL_SIZE)],
+                    int(random_() * self.users) + 1,
+                    published + timedelta(
+                        seconds=int(random_() * COMMENT_DELAY_SECONDS)
+                    ),
+                )
+
+
+def write_csv(generator, model, output):
+    """Записывает CSV-файл модели и возвращает количество строк и время.
+    Вызывается в процессе пула: таблицы генерируются независимо.
+    """
+    started = time.monotonic()
+    written = 0
+    with open(
+        os.path.join(output, MODELS_DATA[model]), 'w',
+        encoding='utf-8', newline='',
+    ) as file:
+        writer = csv.writer(file)
+        writer.writerow(HEADERS[model])
+        for batch in batches(generator.rows(model), DEFAULT_BATCH_SIZE):
+            writer.writerows(batch)
+            written += len(batch)
+    return written, time.monotonic() - started
+
+
+class Command(BaseCommand):
+    """Команда, генерирующая синтетический набор данных для нагрузочного
+    тестирования.
+    Использование:
+    python manage.py generate_data --users 1000000 --titles 500000
+    --reviews 50000000 --output /tmp/data - запись CSV-файлов, которые
+    затем загружаются командой csv_to_db --data-dir /tmp/data;
+    без --output данные записываются напрямую в пустую базу данных.
+    Одинаковый --seed дает одинаковые данные. CSV-файлы таблиц
+    генерируются параллельно в пуле процессов.
+    """
+
+    help = 'Генерация синтетических данных для нагрузочного тестирования.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--genres', type=int, default=30)
+        parser.add_argument('--titles', type=int, default=5000)
+        parser.add_argument('--reviews', type=int, default=100000)
+        parser.add_argument(
+            '--comments-per-review',
+            type=float,
+            default=1.0,
+            help='Среднее количество комментариев к отзыву.',
+        )
+        parser.add_argument(
+            '--zipf',
+            type=float,
+            default=1.1,
+            help='Показатель распределения Ципфа для популярности '
+                 'произведений.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--output',
+            help='Каталог для CSV-файлов. Если не задан, данные '
+                 'записываются в базу данных.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Количество строк в одной пакетной вставке.',
+        )
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['titles'] < 1:
+            raise CommandError(
+                'Нужен хотя бы один пользователь и одно произведение.'
+            )
+        if options['reviews'] > options['users'] * options['titles']:
+            raise CommandError(
+                'Отзывов не может быть больше, чем пар '
+                'пользователь-произведение.'
+            )
+        generator = DataGenerator(
+            users=options['users'],
+            categories=options['categories'],
+            genres=options['genres'],
+            titles=options['titles'],
+            reviews=options['reviews'],
+            comments_per_review=options['comments_per_review'],
+            exponent=options['zipf'],
+            seed=options['seed'],
+        )
+        models = [model for stage in LOAD_STAGES for model in stage]
+        if options['output']:
+            os.makedirs(options['output'], exist_ok=True)
+            with ProcessPoolExecutor() as executor:
+                results = executor.map(
+                    write_csv,
+                    [generator] * len(models),
+                    models,
+                    [options['output']] * len(models),
+                )
+                for model, (written, elapsed) in zip(models, results):
+                    self.report(model, written, elapsed)
+            return
+        for model in models:
+            started = time.monotonic()
+            written = self.write_db(
+                model, generator.rows(model), options['batch_size']
+            )
+            self.report(model, written, time.monotonic() - started)
+        call_command('rebuild_ratings', stdout=self.stdout)
+
+    def report(self, model, written, elapsed):
+        self.stdout.write(self.style.SUCCESS(
+            f'Данные объекта {model.__name__} сгенерированы: '
+            f'{written} строк за {elapsed:.1f} с.'
+        ))
+
+    def write_db(self, model, rows, batch_size):
+        attnames = [
+            model._meta.get_field(rename_field(model, name)).attname
+            for name in HEADERS[model]
+        ]
+        written = 0
+        with values_from_csv(model), transaction.atomic():
+            for batch in batches(rows, batch_size):
+                model.objects.bulk_create(
+                    model(**dict(zip(attnames, row))) for row in batch
+                )
+                written += len(batch)
+        bulk_data_changed.send(sender=model)
+        return written
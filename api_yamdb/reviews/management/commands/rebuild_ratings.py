@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.models import Title
+from reviews.signals import bulk_data_changed
+
+
+class Command(BaseCommand):
+    """Команда, пересчитывающая сохраненные рейтинги произведений.
+    Использование:
+    python manage.py rebuild_ratings.
+    """
+
+    help = 'Пересчет счетчиков рейтинга произведений по отзывам.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = Title.objects.rebuild_ratings()
+        bulk_data_changed.send(sender=Title)
+        self.stdout.write(self.style.SUCCESS(
+            f'Рейтинг пересчитан для {updated} произведений.'
+        ))
@@ -1,6 +1,8 @@
 from django.contrib.auth import get_user_model
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
 
 from core.models import BaseNameSlugModel
 from reviews import const
@@ -9,6 +11,54 @@ from reviews.validators import validate_year
 User = get_user_model()
 
 
+class TitleQuerySet(models.QuerySet):
+    """QuerySet произведений с операциями над счетчиками рейтинга."""
+
+    def change_rating(self, score_delta, count_delta=0):
+        """Атомарно изменяет счетчики рейтинга на уровне БД."""
+        return self.update(
+            rating_sum=F('rating_sum') + score_delta,
+            rating_count=F('rating_count') + count_delta,
+        )
+
+    def bulk_create_with_genres(self, items):
+        """Создает произведения с жанрами двумя пакетными вставками.
+        `items` - словари полей произведения с ключом `genre`.
+        Вызывается внутри транзакции.
+        """
+        genres = [item.pop('genre', ()) for item in items]
+        titles = self.bulk_create(Title(**item) for item in items)
+        if titles and titles[0].pk is None:
+            # Без RETURNING (SQLite) id читаются после вставки: в открытой
+            # транзакции SQLite не допускает других писателей, поэтому
+            # последние len(titles) id принадлежат этой вставке.
+            ids = self.model.objects.order_by('-pk').values_list(
+                'pk', flat=True
+            )[:len(titles)]
+            for title, pk in zip(titles, list(ids)[::-1]):
+                title.pk = pk
+        GenreTitle.objects.bulk_create(
+            GenreTitle(title=title, genre=genre)
+            for title, title_genres in zip(titles, genres)
+            for genre in title_genres
+        )
+        return titles
+
+    def rebuild_ratings(self):
+        """Пересчитывает счетчики рейтинга по всем отзывам произведений."""
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+        return self.update(
+            rating_sum=Coalesce(Subquery(
+                reviews.annotate(total=Sum('score')).values('total')
+            ), 0),
+            rating_count=Coalesce(Subquery(
+                reviews.annotate(total=Count('pk')).values('total')
+            ), 0),
+        )
+
+
 class Title(models.Model):
     """Модель произведения."""
 
@@ -38,16 +88,38 @@ class Title(models.Model):
         null=True,
         blank=True
     )
+    rating_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок',
+        default=0,
+        editable=False,
+    )
+    rating_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок',
+        default=0,
+        editable=False,
+    )
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'произведения'
         default_related_name = '%(class)ss'
         ordering = ('name',)
+        indexes = (
+            models.Index(fields=('name', 'id'), name='title_name_id_idx'),
+        )
 
     def __str__(self):
         return self.name[:const.MAX_STR_LENGTH]
 
+    @property
+    def rating(self):
+        """Средняя оценка произведения по сохраненным счетчикам."""
+        if not self.rating_count:
+            return None
+        return self.rating_sum / self.rating_count
+
 
 class Category(BaseNameSlugModel):
     """Модель категории."""
@@ -122,11 +194,24 @@ class Review(models.Model):
                 name='unique review',
             )
         ]
+        indexes = (
+            models.Index(
+                fields=('title', 'pub_date', 'id'),
+                name='review_title_pub_date_idx',
+            ),
+        )
         ordering = ('pub_date',)
 
     def __str__(self):
         return self.text[:const.MAX_STR_LENGTH]
 
+    def save(self, *args, **kwargs):
+        """Сохраняет отзыв в одной транзакции с пересчетом рейтинга
+        произведения (обработчики pre_save и post_save в api.signals).
+        """
+        with transaction.atomic(using=kwargs.get('using'), savepoint=False):
+            super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     """Модель комментариев."""
@@ -152,6 +237,12 @@ class Comment(models.Model):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         default_related_name = '%(class)ss'
+        indexes = (
+            models.Index(
+                fields=('review', 'pub_date', 'id'),
+                name='comment_review_pub_date_idx',
+            ),
+        )
 
     def __str__(self):
         return self.text[:const.MAX_STR_LENGTH]
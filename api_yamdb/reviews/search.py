@@ -0,0 +1,122 @@
+"""Полнотекстовый поиск произведений на базе SQLite FTS5.
+
+Индекс хранится в виртуальной таблице с внешним содержимым
+(`content=reviews_title`) и поддерживается триггерами на таблице
+произведений, поэтому синхронизирован с любыми способами записи,
+включая `bulk_create` и `update`. Миграции, пересоздающие таблицу
+`reviews_title`, удаляют и триггеры: после каждой команды migrate
+`restore_title_search` устанавливает недостающие триггеры заново и
+перестраивает индекс.
+"""
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+
+from reviews import const
+
+TABLE = const.TITLE_SEARCH_TABLE
+
+CREATE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5("
+    "name, description, content='reviews_title', content_rowid='id')",
+    f"CREATE TRIGGER IF NOT EXISTS {TABLE}_ai AFTER INSERT ON reviews_title "
+    f"BEGIN INSERT INTO {TABLE}(rowid, name, description) "
+    "VALUES (new.id, new.name, new.description); END",
+    f"CREATE TRIGGER IF NOT EXISTS {TABLE}_ad AFTER DELETE ON reviews_title "
+    f"BEGIN INSERT INTO {TABLE}({TABLE}, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); END",
+    f"CREATE TRIGGER IF NOT EXISTS {TABLE}_au "
+    "AFTER UPDATE OF name, description ON reviews_title "
+    f"BEGIN INSERT INTO {TABLE}({TABLE}, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); "
+    f"INSERT INTO {TABLE}(rowid, name, description) "
+    "VALUES (new.id, new.name, new.description); END",
+    f"INSERT INTO {TABLE}({TABLE}) VALUES ('rebuild')",
+)
+
+TRIGGERS = {f'{TABLE}_ai', f'{TABLE}_ad', f'{TABLE}_au'}
+
+DROP_SQL = (
+    f'DROP TRIGGER IF EXISTS {TABLE}_ai',
+    f'DROP TRIGGER IF EXISTS {TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {TABLE}_au',
+    f'DROP TABLE IF EXISTS {TABLE}',
+)
+
+
+def is_available(using=connection):
+    """Проверяет, поддерживает ли база данных полнотекстовый индекс."""
+    return using.vendor == 'sqlite'
+
+
+def install_title_search(schema_editor):
+    """Создает индекс и триггеры синхронизации, заполняет индекс."""
+    if not is_available(schema_editor.connection):
+        return
+    for statement in CREATE_SQL:
+        schema_editor.execute(statement)
+
+
+def uninstall_title_search(schema_editor):
+    if not is_available(schema_editor.connection):
+        return
+    for statement in DROP_SQL:
+        schema_editor.execute(statement)
+
+
+def restore_title_search(using=DEFAULT_DB_ALIAS, **kwargs):
+    """Обработчик post_migrate: если индекс создан, а триггеры удалены
+    миграцией, пересоздающей `reviews_title`, устанавливает их заново и
+    перестраивает индекс (записи без триггеров в него не попали).
+    """
+    db = connections[using]
+    if not is_available(db):
+        return
+    with db.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name = %s "
+            "OR (type = 'trigger' AND tbl_name = 'reviews_title')",
+            (TABLE,),
+        )
+        names = {row[0] for row in cursor.fetchall()}
+    if TABLE not in names or TRIGGERS <= names:
+        return
+    with db.schema_editor() as schema_editor:
+        install_title_search(schema_editor)
+
+
+def build_match_query(text):
+    """Преобразует пользовательский ввод в безопасный запрос FTS5.
+
+    Каждое слово берется в кавычки, последнее ищется как префикс.
+    """
+    words = re.findall(r'\w+', text)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def search_titles(queryset, text, by_rank=True):
+    """Произведения из `queryset`, совпадающие с запросом, с рангом
+    релевантности `search_rank` (меньше - релевантнее), при `by_rank`
+    упорядоченные по нему. Индекс
+    соединяется с `reviews_title` в одном запросе, поэтому число
+    результатов не ограничено, а пагинация и `count` работают по всем
+    совпадениям.
+    """
+    match_query = build_match_query(text)
+    if match_query is None:
+        return queryset.none()
+    queryset = queryset.extra(
+        tables=[TABLE],
+        where=[f'{TABLE}.rowid = reviews_title.id', f'{TABLE} MATCH %s'],
+        params=[match_query],
+        select={'search_rank': f'bm25({TABLE}, %s, %s)'},
+        select_params=(
+            const.TITLE_SEARCH_NAME_WEIGHT,
+            const.TITLE_SEARCH_DESCRIPTION_WEIGHT,
+        ),
+    )
+    return queryset.order_by('search_rank', 'pk') if by_rank else queryset
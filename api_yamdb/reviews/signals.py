@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+# Отправляется после массового изменения данных в обход моделей
+# (например, пересчета рейтингов или загрузки CSV). Необязательный
+# аргумент `instances` - список созданных или измененных объектов.
+bulk_data_changed = Signal()
@@ -0,0 +1,18 @@
+# Generated by Django 3.2 on 2026-10-17 01:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='token_version',
+            field=models.PositiveIntegerField(default=0, help_text='Увеличивается при смене имени, роли, прав суперпользователя или активности: выданные токены отзываются.', verbose_name='Версия токенов'),
+        ),
+    ]
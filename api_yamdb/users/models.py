@@ -31,6 +31,14 @@ class User(AbstractUser):
         choices=ROLE_CHOICES,
         default=const.ROLE_USER,
     )
+    token_version = models.PositiveIntegerField(
+        verbose_name='Версия токенов',
+        default=0,
+        help_text=(
+            'Увеличивается при смене имени, роли, прав суперпользователя '
+            'или активности: выданные токены отзываются.'
+        ),
+    )
 
     class Meta:
         verbose_name = 'пользователь'
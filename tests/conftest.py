@@ -1,6 +1,8 @@
 import os
 import sys
 
+import pytest
+from django.core.cache import caches
 from django.utils.version import get_version
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -32,4 +34,37 @@ assert get_version() < '4.0.0', 'Пожалуйста, используйте в
 
 pytest_plugins = [
     'tests.fixtures.fixture_user',
+    'tests.fixtures.fixture_query_budget',
 ]
+
+
+@pytest.fixture(autouse=True)
+def disable_slow_query_log(settings):
+    settings.SLOW_QUERY_THRESHOLD_MS = None
+
+
+@pytest.fixture(autouse=True)
+def synchronous_mail(settings):
+    """Письма отправляются до ответа, чтобы их можно было проверить."""
+    settings.MAIL_WORKERS = 0
+
+
+@pytest.fixture(autouse=True)
+def disable_throttling(settings):
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}
+    }
+
+
+@pytest.fixture(autouse=True)
+def throttle_cache_dir(settings, tmp_path):
+    """Ведра ограничения частоты пишутся во временный каталог теста."""
+    settings.CACHES = {**settings.CACHES, 'throttle': {
+        **settings.CACHES['throttle'], 'LOCATION': str(tmp_path / 'throttle')
+    }}
+
+
+@pytest.fixture(autouse=True)
+def clear_caches(throttle_cache_dir):
+    for cache in caches.all():
+        cache.clear()
@@ -0,0 +1,22 @@
+import pytest
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.fixture(autouse=True)
+def strict_query_budget(settings):
+    """Превышение `query_budget` любого вьюсета в тестах - ошибка."""
+    settings.QUERY_BUDGET_STRICT = True
+
+
+@pytest.fixture
+def count_queries():
+    """Выполняет GET-запрос с пустыми кэшами и считает SQL-запросы."""
+    def count(client, url, **params):
+        for cache in caches.all():
+            cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, params)
+        return response, len(context)
+    return count
@@ -0,0 +1,123 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Review, Title
+from tests.utils import create_reviews, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def get_rating(self, client, title_id):
+        response = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.OK
+        return response.json().get('rating')
+
+    def test_01_rating_follows_review_changes(self, client, admin_client,
+                                              admin, user_client, user):
+        author_map = {admin: admin_client, user: user_client}
+        reviews, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        assert self.get_rating(client, title_id) == 5, (
+            'Проверьте, что рейтинг произведения учитывает новые отзывы.'
+        )
+
+        response = user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[1]['id']
+            ),
+            data={'score': 9}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_rating(client, title_id) == 7, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'изменении оценки в отзыве.'
+        )
+
+        response = admin_client.delete(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[0]['id']
+            )
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_rating(client, title_id) == 9, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'удалении отзыва.'
+        )
+
+        Title.objects.filter(pk=title_id).update(
+            rating_sum=100, rating_count=3
+        )
+        call_command('rebuild_ratings')
+        title = Title.objects.get(pk=title_id)
+        assert (title.rating_sum, title.rating_count) == (9, 1), (
+            'Проверьте, что команда `rebuild_ratings` пересчитывает '
+            'счетчики рейтинга по отзывам.'
+        )
+        assert self.get_rating(client, title_id) == 9
+
+        Review.objects.all().delete()
+        assert self.get_rating(client, title_id) is None
+
+    def test_02_cascade_delete(self, client, admin_client, user_client,
+                               user, moderator_client, moderator):
+        author_map = {user: user_client, moderator: moderator_client}
+        reviews, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[0]['id']
+            ),
+            data={'score': 9}
+        )
+        assert self.get_rating(client, title_id) == 7
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_rating(client, title_id) == 5, (
+            'Проверьте, что при удалении пользователя его оценки '
+            'вычитаются из рейтинга произведений.'
+        )
+        moderator.delete()
+        title = Title.objects.get(pk=title_id)
+        assert (title.rating_sum, title.rating_count) == (0, 0)
+
+    def test_03_orm_writes(self, client, admin_client, user, moderator):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review = Review.objects.create(
+            title_id=title_id, author=user, text='Отзыв', score=4
+        )
+        assert self.get_rating(client, title_id) == 4, (
+            'Проверьте, что отзыв, созданный не через API, учитывается '
+            'в рейтинге.'
+        )
+        stale = Review.objects.get(pk=review.pk)
+        review.score = 8
+        review.save()
+        stale.score = 6
+        stale.save()
+        title = Title.objects.get(pk=title_id)
+        assert (title.rating_sum, title.rating_count) == (6, 1), (
+            'Проверьте, что разница оценок считается по сохраненной '
+            'строке отзыва, а не по загруженному ранее объекту.'
+        )
+        review.delete()
+        Review.objects.create(
+            title_id=title_id, author=moderator, text='Отзыв', score=3
+        )
+        response = admin_client.delete(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT, (
+            'Проверьте, что произведение с отзывами, созданными не через '
+            'API, удаляется.'
+        )
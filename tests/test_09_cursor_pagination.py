@@ -0,0 +1,87 @@
+import json
+from base64 import b64encode
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09CursorPagination:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def walk(self, client, url):
+        names, previous = [], None
+        while url:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            assert 'count' not in data, (
+                'Проверьте, что в режиме курсора не выполняется подсчет '
+                'общего количества объектов.'
+            )
+            names.extend(data['results'])
+            previous, url = data['previous'], data['next']
+        return names, previous
+
+    def test_01_titles_cursor(self, client, admin_client):
+        create_reviews(admin_client, {})
+        response = client.get(self.TITLES_URL, {'limit': 1, 'offset': 1})
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert data['count'] == 2, (
+            'Проверьте, что пагинация limit/offset продолжает работать.'
+        )
+
+        titles, previous = self.walk(
+            client, f'{self.TITLES_URL}?cursor=&limit=1'
+        )
+        names = [title['name'] for title in titles]
+        assert names == sorted(names) and len(names) == 2, (
+            'Проверьте, что в режиме курсора произведения выдаются '
+            'по порядку названий без пропусков и повторов.'
+        )
+        response = client.get(previous)
+        assert response.json()['results'] == titles[:1], (
+            'Проверьте, что ссылка `previous` в режиме курсора ведет '
+            'на предыдущую страницу.'
+        )
+        response = client.get(self.TITLES_URL, {'cursor': 'broken'})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_02_reviews_cursor(self, client, admin_client, admin, user,
+                               user_client, moderator, moderator_client):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        reviews, titles = create_reviews(admin_client, author_map)
+        results, _ = self.walk(
+            client,
+            self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+            + '?cursor=&limit=2'
+        )
+        assert [review['id'] for review in results] == [
+            review['id'] for review in reviews
+        ], (
+            'Проверьте, что в режиме курсора отзывы упорядочены по дате '
+            'публикации и `id`.'
+        )
+
+    def test_03_invalid_cursor_position(self, client, admin_client, user,
+                                        user_client):
+        _, titles = create_reviews(admin_client, {user: user_client})
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        for position in (
+            ['notadate', 1, 0], [None, 1, 0], ['2020-01-01T00:00:00', 'x', 0]
+        ):
+            cursor = b64encode(json.dumps(position).encode()).decode()
+            response = client.get(url, {'cursor': cursor})
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                'Проверьте, что курсор с позицией неподходящего типа '
+                f'({position}) дает ответ 404.'
+            )
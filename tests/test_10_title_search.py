@@ -0,0 +1,93 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from reviews.models import Title
+from reviews.search import TRIGGERS
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10TitleSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def search(self, client, query):
+        response = client.get(self.TITLES_URL, {'q': query})
+        assert response.status_code == HTTPStatus.OK
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_search(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        assert self.search(client, 'терминатор') == ['Терминатор'], (
+            'Проверьте, что параметр `q` ищет произведения по названию '
+            'без учета регистра.'
+        )
+        assert self.search(client, 'Yippie') == ['Крепкий орешек'], (
+            'Проверьте, что параметр `q` ищет произведения по описанию.'
+        )
+        assert self.search(client, 'Терми') == ['Терминатор'], (
+            'Проверьте, что последнее слово запроса `q` ищется по префиксу.'
+        )
+        assert self.search(client, '"*)(') == []
+
+        Title.objects.create(name='Back to the future', description='back')
+        assert self.search(client, 'back') == [
+            'Back to the future', 'Терминатор'
+        ], (
+            'Проверьте, что совпадения в названии ранжируются выше '
+            'совпадений в описании.'
+        )
+
+        Title.objects.filter(pk=titles[0]['id']).update(name='Хищник')
+        assert self.search(client, 'терминатор') == []
+        assert self.search(client, 'хищник') == ['Хищник']
+        Title.objects.filter(pk=titles[1]['id']).delete()
+        assert self.search(client, 'Yippie') == [], (
+            'Проверьте, что полнотекстовый индекс синхронизирован '
+            'с изменениями произведений.'
+        )
+
+    def test_02_triggers_restored_after_migrate(self, client, admin_client):
+        create_titles(admin_client)
+        # Так триггеры удаляет миграция, пересоздающая reviews_title.
+        with connection.cursor() as cursor:
+            for trigger in sorted(TRIGGERS):
+                cursor.execute(f'DROP TRIGGER {trigger}')
+        Title.objects.create(name='Солярис', description='')
+        call_command('migrate', verbosity=0)
+        assert self.search(client, 'солярис') == ['Солярис'], (
+            'Проверьте, что после migrate индекс поиска перестраивается, '
+            'если триггеры были удалены.'
+        )
+        Title.objects.filter(name='Солярис').update(name='Сталкер')
+        assert self.search(client, 'сталкер') == ['Сталкер'], (
+            'Проверьте, что после migrate триггеры поиска установлены '
+            'заново.'
+        )
+
+    def test_03_pagination_over_all_matches(self, client):
+        Title.objects.bulk_create(
+            Title(name=f'Солярис {number}', year=1972) for number in range(25)
+        )
+        Title.objects.create(name='Солярис', year=1961)
+        response = client.get(
+            self.TITLES_URL, {'q': 'солярис', 'limit': 10, 'offset': 20}
+        )
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert data['count'] == 26 and len(data['results']) == 6, (
+            'Проверьте, что поиск `q` не ограничивает число результатов, '
+            'а `count` и страницы считаются по всем совпадениям.'
+        )
+        first = client.get(self.TITLES_URL, {'q': 'солярис', 'limit': 1})
+        assert first.json()['results'][0]['name'] == 'Солярис', (
+            'Проверьте, что результаты поиска упорядочены по релевантности.'
+        )
+        response = client.get(self.TITLES_URL, {'q': 'солярис', 'cursor': ''})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что режим курсора, сортирующий по названию, нельзя '
+            'сочетать с поиском `q`.'
+        )
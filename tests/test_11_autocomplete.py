@@ -0,0 +1,49 @@
+from http import HTTPStatus
+
+import pytest
+
+from api.autocomplete import autocomplete
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11Autocomplete:
+
+    AUTOCOMPLETE_URL = '/api/v1/autocomplete/'
+
+    def test_01_autocomplete(self, client, admin_client,
+                             django_assert_num_queries):
+        autocomplete.rebuild()
+        titles, categories, genres = create_titles(admin_client)
+
+        response = client.get(self.AUTOCOMPLETE_URL, {'q': 'кр'})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что эндпоинт `{self.AUTOCOMPLETE_URL}` доступен '
+            'неавторизованному пользователю.'
+        )
+        assert response.json() == {
+            'titles': [{'id': titles[1]['id'], 'name': 'Крепкий орешек'}],
+            'genres': [],
+            'categories': [],
+        }
+        with django_assert_num_queries(0):
+            response = client.get(self.AUTOCOMPLETE_URL, {'q': 'К'})
+        assert response.json()['genres'] == [genres[1]]
+        assert response.json()['categories'] == [categories[1]]
+
+        admin_client.patch(
+            f'/api/v1/titles/{titles[1]["id"]}/', data={'name': 'Рэмбо'}
+        )
+        admin_client.delete(f'/api/v1/genres/{genres[1]["slug"]}/')
+        response = client.get(self.AUTOCOMPLETE_URL, {'q': 'К', 'limit': 1})
+        assert response.json() == {
+            'titles': [],
+            'genres': [],
+            'categories': [categories[1]],
+        }, (
+            'Проверьте, что индекс автодополнения обновляется при '
+            'изменении и удалении объектов.'
+        )
+
+        response = client.get(self.AUTOCOMPLETE_URL)
+        assert response.status_code == HTTPStatus.BAD_REQUEST
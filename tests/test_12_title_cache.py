@@ -0,0 +1,60 @@
+from http import HTTPStatus
+
+import pytest
+
+from api.cache import title_cache
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12TitleResponseCache:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    def get(self, client, url, params=None, cache_status='HIT'):
+        response = client.get(url, params)
+        assert response.status_code == HTTPStatus.OK
+        assert response['X-Cache'] == cache_status, (
+            f'Проверьте, что ответ на GET-запрос к `{url}` '
+            f'имеет статус кэша {cache_status}.'
+        )
+        return response.json()
+
+    def test_01_title_cache(self, client, admin_client, user_client):
+        titles, categories, genres = create_titles(admin_client)
+        detail_url = self.TITLE_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id']
+        )
+        stats = title_cache.stats()
+
+        self.get(client, self.TITLES_URL, {'year': 1984, 'limit': 5}, 'MISS')
+        self.get(client, self.TITLES_URL, {'limit': 5, 'year': 1984})
+        self.get(client, detail_url, cache_status='MISS')
+        assert self.get(client, detail_url)['rating'] is None
+        assert title_cache.stats() == {
+            'hits': stats['hits'] + 2, 'misses': stats['misses'] + 2
+        }
+
+        create_single_review(user_client, titles[0]['id'], 'text', 7)
+        data = self.get(client, detail_url, cache_status='MISS')
+        assert data['rating'] == 7, (
+            'Проверьте, что кэш произведения сбрасывается при '
+            'добавлении отзыва.'
+        )
+        self.get(
+            client, self.TITLES_URL, {'year': 1984, 'limit': 5}, 'MISS'
+        )
+
+        admin_client.patch(detail_url, data={'genre': [genres[2]['slug']]})
+        data = self.get(client, detail_url, cache_status='MISS')
+        assert data['genre'] == [genres[2]], (
+            'Проверьте, что кэш произведения сбрасывается при '
+            'изменении жанров.'
+        )
+        admin_client.delete(f'/api/v1/categories/{categories[0]["slug"]}/')
+        data = self.get(client, detail_url, cache_status='MISS')
+        assert data['category'] is None, (
+            'Проверьте, что кэш произведения сбрасывается при '
+            'удалении категории.'
+        )
@@ -0,0 +1,118 @@
+import time
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import caches
+from django.utils.http import http_date
+
+from api.cache import resource_versions
+from tests.utils import create_categories, create_reviews, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13ConditionalGet:
+
+    CATEGORIES_URL = '/api/v1/categories/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def test_01_categories_etag(self, client, admin_client,
+                                django_assert_num_queries, monkeypatch):
+        create_categories(admin_client)
+        # Last-Modified отдается, когда секунда изменения уже прошла.
+        monkeypatch.setattr(
+            'api.mixins.time_ns', lambda: time.time_ns() + 2 * 10 ** 9
+        )
+        response = client.get(self.CATEGORIES_URL)
+        assert response.status_code == HTTPStatus.OK
+        etag = response['ETag']
+        assert etag and response.has_header('Last-Modified'), (
+            f'Проверьте, что ответ на GET-запрос к `{self.CATEGORIES_URL}` '
+            'содержит заголовки `ETag` и `Last-Modified`.'
+        )
+
+        with django_assert_num_queries(0):
+            response = client.get(
+                self.CATEGORIES_URL, HTTP_IF_NONE_MATCH=etag
+            )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что при совпадении `If-None-Match` возвращается '
+            'ответ со статусом 304 без обращения к БД.'
+        )
+        assert not response.content
+        response = client.get(
+            self.CATEGORIES_URL,
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        response = client.get(
+            self.CATEGORIES_URL, {'search': 'Фильм'}, HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == HTTPStatus.OK
+
+        admin_client.post(
+            self.CATEGORIES_URL, data={'name': 'Музыка', 'slug': 'music'}
+        )
+        response = client.get(self.CATEGORIES_URL, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что `ETag` меняется после изменения данных.'
+        )
+        assert response.json()['count'] == 3
+
+    def test_02_reviews_etag(self, client, admin_client, admin, user,
+                             user_client):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        etag = client.get(url)['ETag']
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+        other_url = self.REVIEWS_URL_TEMPLATE.format(
+            title_id=titles[1]['id']
+        )
+        other_etag = client.get(other_url)['ETag']
+        create_single_review(user_client, titles[0]['id'], 'text', 3)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['count'] == 2
+        response = client.get(other_url, HTTP_IF_NONE_MATCH=other_etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что изменение отзывов одного произведения не '
+            'сбрасывает `ETag` отзывов другого.'
+        )
+
+    def test_03_same_second_change(self, client, admin_client, monkeypatch):
+        create_categories(admin_client)
+        now = max(resource_versions.get(('categories',)).values())
+        monkeypatch.setattr('api.mixins.time_ns', lambda: now)
+        response = client.get(self.CATEGORIES_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert not response.has_header('Last-Modified'), (
+            'Проверьте, что `Last-Modified` не отдается, пока не прошла '
+            'секунда последнего изменения.'
+        )
+        response = client.get(
+            self.CATEGORIES_URL,
+            HTTP_IF_MODIFIED_SINCE=http_date(now // 10 ** 9),
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение в ту же секунду, что и '
+            '`If-Modified-Since`, не дает ответа 304.'
+        )
+
+    def test_04_unknown_object_tags_expire(self, client, monkeypatch):
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=987654)
+        assert client.get(url).status_code == HTTPStatus.NOT_FOUND
+        key = resource_versions.tag_key('title:987654')
+        assert caches['versions'].get(key) is not None
+        assert not caches['default'].get_many([key]), (
+            'Проверьте, что версии ресурсов хранятся отдельно от ведер '
+            'throttling и версий токенов.'
+        )
+        now = time.time() + 3601
+        monkeypatch.setattr(
+            'django.core.cache.backends.locmem.time.time', lambda: now
+        )
+        assert caches['versions'].get(key) is None, (
+            'Проверьте, что версия тега, созданного по адресу запроса, '
+            'хранится ограниченное время.'
+        )
@@ -0,0 +1,49 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14SlugCache:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_titles_without_lookup_queries(self, client, admin_client,
+                                              django_assert_num_queries):
+        titles, categories, genres = create_titles(admin_client)
+        client.get(self.TITLES_URL)
+        with django_assert_num_queries(3):
+            response = client.get(
+                self.TITLES_URL,
+                {'genre': genres[0]['slug'], 'category': categories[0]['slug']}
+            )
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()['results']
+        assert [title['name'] for title in data] == [titles[0]['name']], (
+            'Проверьте фильтрацию произведений по slug жанра и категории.'
+        )
+        assert data[0]['genre'] == genres[:2][::-1]
+        assert data[0]['category'] == categories[0]
+
+        admin_client.post('/api/v1/genres/', data={
+            'name': 'Вестерн', 'slug': 'western'
+        })
+        response = admin_client.post(self.TITLES_URL, data={
+            'name': 'Хороший, плохой, злой',
+            'year': 1966,
+            'genre': ['western'],
+            'category': categories[0]['slug'],
+        })
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что новый жанр сразу доступен при создании '
+            'произведения.'
+        )
+        response = admin_client.post(self.TITLES_URL, data={
+            'name': 'Хороший, плохой, злой',
+            'year': 1966,
+            'genre': ['unknown'],
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'genre' in response.json()
@@ -0,0 +1,63 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Title
+from tests.utils import create_categories, create_genre
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15TitlesBulkCreate:
+
+    BULK_URL = '/api/v1/titles/bulk/'
+
+    def test_01_bulk_create(self, admin_client, user_client, client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        data = [
+            {
+                'name': f'Произведение {number}',
+                'year': 2000 + number,
+                'genre': [genres[0]['slug'], genres[number % 2 + 1]['slug']],
+                'category': categories[number % 2]['slug'],
+            }
+            for number in range(3)
+        ]
+        data.insert(1, {'name': 'Без жанра', 'year': 2000, 'genre': []})
+        data.append({'name': 'Из будущего', 'year': 3000, 'genre': ['?']})
+
+        response = user_client.post(self.BULK_URL, data=data, format='json')
+        assert response.status_code == HTTPStatus.FORBIDDEN
+        response = admin_client.post(self.BULK_URL, data=data, format='json')
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос администратора к `{self.BULK_URL}` '
+            'с корректными элементами возвращает ответ со статусом 201.'
+        )
+        result = response.json()
+        assert [item['index'] for item in result['created']] == [0, 2, 3]
+        assert [item['index'] for item in result['errors']] == [1, 4], (
+            'Проверьте, что ошибки валидации возвращаются для каждого '
+            'некорректного элемента с его индексом.'
+        )
+        assert set(result['errors'][1]['errors']) == {'year', 'genre'}
+
+        for item in result['created']:
+            expected = data[item['index']]
+            title = client.get(f'/api/v1/titles/{item["id"]}/').json()
+            assert title['name'] == expected['name']
+            assert title['category']['slug'] == expected['category']
+            assert sorted(genre['slug'] for genre in title['genre']) == (
+                sorted(expected['genre'])
+            )
+        response = client.get('/api/v1/titles/', {'q': 'Произведение'})
+        assert response.json()['count'] == 3
+
+        response = admin_client.post(
+            self.BULK_URL, data=data[1:2], format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = admin_client.post(
+            self.BULK_URL, data=data[0], format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert Title.objects.count() == 3
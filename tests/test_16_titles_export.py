@@ -0,0 +1,43 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+from api.export import export_titles
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16TitlesExport:
+
+    EXPORT_URL = '/api/v1/titles/export/'
+
+    def test_01_export(self, client, admin_client, user_client):
+        reviews, titles = create_reviews(admin_client, {})
+        response = user_client.get(self.EXPORT_URL)
+        assert response.status_code == HTTPStatus.FORBIDDEN
+        response = client.get(self.EXPORT_URL)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+        response = admin_client.get(self.EXPORT_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert response.streaming, (
+            f'Проверьте, что `{self.EXPORT_URL}` отдает потоковый ответ.'
+        )
+        assert response['Content-Type'] == 'application/x-ndjson'
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        exported = [json.loads(line) for line in lines]
+        assert [title['id'] for title in exported] == sorted(
+            title['id'] for title in titles
+        )
+        detail = client.get(f'/api/v1/titles/{exported[0]["id"]}/').json()
+        assert exported[0] == detail, (
+            'Проверьте, что строки выгрузки совпадают с представлением '
+            'произведения в API.'
+        )
+
+    def test_02_export_batches(self, admin_client):
+        _, titles = create_reviews(admin_client, {})
+        chunks = list(export_titles(batch_size=1))
+        assert len(chunks) == len(titles)
+        assert all(chunk.count('\n') == 1 for chunk in chunks)
@@ -0,0 +1,107 @@
+import csv
+import shutil
+from datetime import date
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import CommandError, call_command
+
+from reviews.management.commands.csv_to_db import MODELS_DATA
+from reviews.models import Review, Title
+
+
+def count_rows(csv_file):
+    with open(
+        f'{settings.BASE_DIR}/static/data/{csv_file}', encoding='utf-8'
+    ) as file:
+        return sum(1 for _ in csv.DictReader(file))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17CsvToDb:
+
+    def test_01_load_in_batches(self):
+        out = StringIO()
+        call_command('csv_to_db', batch_size=7, stdout=out)
+        for model, csv_file in MODELS_DATA.items():
+            assert model.objects.count() == count_rows(csv_file), (
+                f'Проверьте, что команда `csv_to_db` загружает все строки '
+                f'файла `{csv_file}`.'
+            )
+        assert 'строк/с' in out.getvalue()
+        assert Title.objects.filter(rating_count__gt=0).exists()
+
+    def test_02_upsert(self):
+        call_command('csv_to_db', stdout=StringIO())
+        Title.objects.filter(pk=1).update(name='Измененное название')
+        Title.objects.filter(pk=2).delete()
+
+        out = StringIO()
+        call_command('csv_to_db', upsert=True, batch_size=10, stdout=out)
+        output = out.getvalue()
+        titles_count = count_rows(MODELS_DATA[Title])
+        assert (
+            f'Title синхронизированы: добавлено 1, обновлено 1, '
+            f'без изменений {titles_count - 2}'
+        ) in output, (
+            'Проверьте, что в режиме `--upsert` добавляются только новые, '
+            'обновляются только измененные строки, а остальные пропускаются.'
+        )
+        assert Title.objects.get(pk=1).name == 'Побег из Шоушенка'
+        for model, csv_file in MODELS_DATA.items():
+            assert model.objects.count() == count_rows(csv_file)
+
+        out = StringIO()
+        call_command('csv_to_db', upsert=True, stdout=out)
+        for model, csv_file in MODELS_DATA.items():
+            assert (
+                f'{model.__name__} синхронизированы: добавлено 0, '
+                f'обновлено 0, без изменений {count_rows(csv_file)}'
+            ) in out.getvalue(), (
+                'Проверьте, что повторный запуск `--upsert` на тех же '
+                'данных ничего не меняет.'
+            )
+
+    def test_03_single_worker(self):
+        out = StringIO()
+        call_command('csv_to_db', workers=1, batch_size=3, stdout=out)
+        for model, csv_file in MODELS_DATA.items():
+            assert model.objects.count() == count_rows(csv_file), (
+                'Проверьте, что команда `csv_to_db` загружает данные '
+                'и с одним процессом разбора файлов.'
+            )
+        output = out.getvalue()
+        assert output.index('User загружены') < output.index(
+            'Title загружены'
+        ) < output.index('Review загружены') < output.index(
+            'Comment загружены'
+        ), 'Проверьте, что данные загружаются в порядке внешних ключей.'
+
+    def test_04_dates_from_csv(self):
+        call_command('csv_to_db', stdout=StringIO())
+        assert Review.objects.get(pk=1).pub_date == date(2019, 9, 24), (
+            'Проверьте, что и без `--upsert` дата публикации берется '
+            'из CSV.'
+        )
+        out = StringIO()
+        call_command('csv_to_db', upsert=True, stdout=out)
+        for model in ('Review', 'Comment'):
+            assert f'{model} синхронизированы: добавлено 0, обновлено 0' in (
+                out.getvalue()
+            ), (
+                'Проверьте, что `--upsert` после обычной загрузки не '
+                'обновляет строки с датами.'
+            )
+
+    def test_05_row_length_mismatch(self, tmp_path):
+        shutil.copytree(f'{settings.BASE_DIR}/static/data', tmp_path / 'data')
+        genres = tmp_path / 'data' / 'genre.csv'
+        lines = genres.read_text(encoding='utf-8').splitlines()
+        lines[2] += ',лишнее'
+        genres.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+        with pytest.raises(CommandError, match='genre.csv, строка 3'):
+            call_command(
+                'csv_to_db', data_dir=str(tmp_path / 'data'),
+                stdout=StringIO(),
+            )
@@ -0,0 +1,68 @@
+import csv
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count
+
+from reviews.management.commands.csv_to_db import MODELS_DATA
+from reviews.models import Comment, Review, Title, User
+
+SIZES = {
+    'users': 50,
+    'titles': 20,
+    'reviews': 300,
+    'comments_per_review': 1.5,
+}
+
+
+def count_rows(path):
+    with open(path, encoding='utf-8') as file:
+        return sum(1 for _ in csv.DictReader(file))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18GenerateData:
+
+    def test_01_csv_loaded_by_csv_to_db(self, tmp_path):
+        call_command(
+            'generate_data', output=str(tmp_path), stdout=StringIO(), **SIZES
+        )
+        call_command('csv_to_db', data_dir=str(tmp_path), stdout=StringIO())
+        for model, csv_file in MODELS_DATA.items():
+            assert model.objects.count() == count_rows(
+                tmp_path / csv_file
+            ), (
+                'Проверьте, что команда `csv_to_db` загружает все строки '
+                f'файла `{csv_file}`, созданного `generate_data`.'
+            )
+        assert User.objects.count() == SIZES['users']
+        assert Review.objects.count() == SIZES['reviews']
+        assert Comment.objects.exists()
+
+    def test_02_seeded_and_skewed(self, tmp_path):
+        for name in ('first', 'second'):
+            call_command(
+                'generate_data', output=str(tmp_path / name), seed=7,
+                stdout=StringIO(), **SIZES
+            )
+        for csv_file in MODELS_DATA.values():
+            assert (tmp_path / 'first' / csv_file).read_bytes() == (
+                tmp_path / 'second' / csv_file
+            ).read_bytes(), (
+                'Проверьте, что при одинаковом `--seed` генерируются '
+                'одинаковые данные.'
+            )
+
+        call_command('generate_data', stdout=StringIO(), **SIZES)
+        counts = sorted(
+            Title.objects.annotate(
+                total=Count('reviews')
+            ).values_list('total', flat=True),
+            reverse=True,
+        )
+        assert counts[0] > 3 * counts[len(counts) // 2], (
+            'Проверьте, что популярность произведений распределена '
+            'неравномерно.'
+        )
+        assert Title.objects.filter(rating_count__gt=0).exists()
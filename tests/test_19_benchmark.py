@@ -0,0 +1,56 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.benchmark import WsgiBenchmark, load_sample
+from reviews.management.commands.csv_to_db import MODELS_DATA
+from reviews.models import Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19Benchmark:
+
+    def test_01_all_routes(self, tmp_path):
+        call_command('csv_to_db', stdout=StringIO())
+        counts = {model: model.objects.count() for model in MODELS_DATA}
+        output = tmp_path / 'benchmark.json'
+
+        call_command(
+            'benchmark', iterations=2, warmup=1, output=str(output),
+            stdout=StringIO()
+        )
+        report = json.loads(output.read_text(encoding='utf-8'))
+        assert report['uncovered'] == [], (
+            'Проверьте, что для каждого маршрута `api/urls.py` есть сценарий.'
+        )
+        for result in report['results']:
+            for key in ('p50_ms', 'p95_ms', 'p99_ms', 'throughput_rps',
+                        'queries', 'sql_ms'):
+                assert key in result, (
+                    f'Проверьте, что в результатах есть поле `{key}`.'
+                )
+            assert all(
+                status.startswith('2') for status in result['statuses']
+            ), (
+                f'Сценарий `{result["name"]}` вернул неуспешный ответ: '
+                f'{result["statuses"]}.'
+            )
+        assert report['meta']['rows']['Title'] == counts[Title]
+        for model, count in counts.items():
+            assert model.objects.count() == count, (
+                'Проверьте, что изменяющие запросы замера откатываются.'
+            )
+
+    def test_02_role_tokens(self):
+        call_command('csv_to_db', stdout=StringIO())
+        benchmark = WsgiBenchmark(load_sample(), iterations=1, warmup=0)
+        for client in ('admin', 'user'):
+            header = benchmark.headers[client]['HTTP_AUTHORIZATION']
+            token = AccessToken(header.split()[1])
+            assert 'token_version' in token, (
+                'Проверьте, что клиенты замера используют токены с claims '
+                'роли, как в работе.'
+            )
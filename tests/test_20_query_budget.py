@@ -0,0 +1,60 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api.benchmark import build_scenarios, load_sample
+from api.mixins import QueryBudgetExceeded, QueryBudgetMixin
+from api.urls import router
+from api.views import CommentViewSet
+
+LARGE_PAGE = 10
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20QueryBudget:
+
+    def test_01_viewsets_declare_budgets(self):
+        for prefix, viewset, basename in router.registry:
+            assert issubclass(viewset, QueryBudgetMixin), (
+                f'Проверьте, что вьюсет `{viewset.__name__}` '
+                'использует `QueryBudgetMixin`.'
+            )
+            assert viewset.query_budget.get('list') is not None, (
+                f'Проверьте, что у вьюсета `{viewset.__name__}` задан '
+                'бюджет запросов для `list`.'
+            )
+
+    def test_02_list_queries_do_not_grow(self, admin_client,
+                                         count_queries):
+        call_command('csv_to_db', stdout=StringIO())
+        clients = {'anon': APIClient(), 'admin': admin_client}
+        scenarios = [
+            scenario for scenario in build_scenarios(load_sample())
+            if scenario.method == 'GET' and scenario.route.endswith('-list')
+        ]
+        checked = 0
+        for scenario in scenarios:
+            url = reverse(scenario.route, kwargs=scenario.kwargs)
+            client = clients[scenario.client]
+            _, small = count_queries(client, url, **scenario.query, limit=1)
+            response, large = count_queries(
+                client, url, **scenario.query, limit=LARGE_PAGE
+            )
+            if len(response.data['results']) < 2:
+                continue
+            checked += 1
+            assert small == large, (
+                f'Количество SQL-запросов `{scenario.name}` растет с '
+                f'размером страницы: {small} при limit=1, {large} при '
+                f'limit={LARGE_PAGE}.'
+            )
+        assert checked >= 5
+
+    def test_03_budget_exceeded(self, user_client, monkeypatch):
+        call_command('csv_to_db', stdout=StringIO())
+        monkeypatch.setattr(CommentViewSet, 'query_budget', {'list': 1})
+        with pytest.raises(QueryBudgetExceeded):
+            user_client.get('/api/v1/titles/1/reviews/1/comments/')
@@ -0,0 +1,50 @@
+import json
+import logging
+
+import pytest
+
+from reviews.models import Category
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21ServerTiming:
+
+    def test_01_header(self, admin_client):
+        Category.objects.create(name='Фильм', slug='movie')
+        response = admin_client.get('/api/v1/categories/')
+        assert response.status_code == 200
+        header = response.get('Server-Timing')
+        assert header, 'Проверьте, что ответ содержит заголовок Server-Timing.'
+        metrics = {
+            metric.split(';')[0].strip(): metric
+            for metric in header.split(',')
+        }
+        for name in ('auth', 'permissions', 'db', 'serialize', 'render',
+                     'total'):
+            assert name in metrics, (
+                f'Проверьте, что заголовок Server-Timing содержит `{name}`.'
+            )
+        assert 'queries' in metrics['db']
+
+    def test_02_log_line(self, client, caplog):
+        logger = logging.getLogger('yamdb.timing')
+        logger.addHandler(caplog.handler)
+        try:
+            client.get('/api/v1/genres/')
+        finally:
+            logger.removeHandler(caplog.handler)
+        records = [
+            json.loads(record.getMessage()) for record in caplog.records
+            if record.name == 'yamdb.timing'
+        ]
+        assert len(records) == 1, (
+            'Проверьте, что для запроса пишется одна строка лога.'
+        )
+        record = records[0]
+        assert record['route'] == 'genres-list'
+        assert record['status'] == 200
+        assert record['db_queries'] >= 1
+        for key in ('total_ms', 'db_ms', 'serialize_ms', 'render_ms'):
+            assert key in record, (
+                f'Проверьте, что строка лога содержит поле `{key}`.'
+            )
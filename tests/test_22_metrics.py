@@ -0,0 +1,107 @@
+import json
+import multiprocessing
+import re
+import threading
+
+import pytest
+
+from core.metrics import http_requests, registry
+
+GENRES_LIST = (
+    'yamdb_http_requests_total{route="genres-list",method="GET",'
+    'status="200"}'
+)
+
+
+def metric_value(text, line_prefix):
+    match = re.search(
+        rf'^{re.escape(line_prefix)} (\S+)$', text, flags=re.MULTILINE
+    )
+    return float(match.group(1)) if match else 0.0
+
+
+def increment_in_child():
+    http_requests.inc(5, route='child', method='GET', status=200)
+    registry.flush()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22Metrics:
+
+    def test_01_routes(self, client):
+        before = metric_value(client.get('/metrics').content.decode(),
+                              GENRES_LIST)
+        client.get('/api/v1/genres/')
+        client.get('/api/v1/genres/')
+        response = client.get('/metrics')
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+        text = response.content.decode()
+        assert metric_value(text, GENRES_LIST) == before + 2, (
+            'Проверьте, что запросы учитываются по имени маршрута.'
+        )
+        assert '# TYPE yamdb_http_request_duration_seconds histogram' in text
+        assert (
+            'yamdb_http_request_duration_seconds_bucket{route="genres-list",'
+            'method="GET",le="+Inf"}'
+        ) in text
+        assert metric_value(
+            text, 'yamdb_db_queries_total{route="genres-list"}'
+        ) >= 2
+        assert 'yamdb_title_cache_requests_total{result="hit"}' in text
+
+    def test_02_threads(self):
+        def work():
+            for _ in range(1000):
+                http_requests.inc(route='threads', method='GET', status=200)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        key = ('threads', 'GET', '200')
+        assert registry.collect()['yamdb_http_requests_total'][key] >= 4000
+        assert registry.collect()['yamdb_http_requests_total'][key] >= 4000
+
+    def test_03_processes(self, client, settings, tmp_path):
+        settings.METRICS_DIR = str(tmp_path)
+        child = multiprocessing.get_context('fork').Process(
+            target=increment_in_child
+        )
+        child.start()
+        child.join()
+        http_requests.inc(2, route='child', method='GET', status=200)
+        text = client.get('/metrics').content.decode()
+        assert len(list(tmp_path.glob('*.json'))) == 2
+        assert metric_value(
+            text,
+            'yamdb_http_requests_total{route="child",method="GET",'
+            'status="200"}'
+        ) == 7, 'Проверьте, что метрики суммируются по процессам.'
+
+    def test_04_gauges_of_exited_processes(self, client, settings, tmp_path):
+        settings.METRICS_DIR = str(tmp_path)
+        before = registry.collect().get('yamdb_http_requests_total', {}).get(
+            ('child', 'GET', '200'), 0
+        )
+        child = multiprocessing.get_context('fork').Process(
+            target=increment_in_child
+        )
+        child.start()
+        child.join()
+        (tmp_path / f'{child.pid}-gauge.json').write_text(json.dumps({
+            'yamdb_mail_queue_depth': [[[], 7]],
+        }), encoding='utf-8')
+        text = client.get('/metrics').content.decode()
+        assert metric_value(
+            text,
+            'yamdb_http_requests_total{route="child",method="GET",'
+            'status="200"}'
+        ) == before + 5, (
+            'Проверьте, что счетчики завершившихся процессов учитываются.'
+        )
+        assert metric_value(text, 'yamdb_mail_queue_depth') == 0, (
+            'Проверьте, что gauge завершившихся процессов не суммируются '
+            'с текущими значениями.'
+        )
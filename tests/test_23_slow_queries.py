@@ -0,0 +1,79 @@
+import json
+import logging
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from core.slow_queries import fingerprint, normalize
+from reviews.models import Category, Genre, Title
+
+
+@pytest.fixture
+def slow_query_records(caplog, settings):
+    settings.SLOW_QUERY_THRESHOLD_MS = 0
+    logger = logging.getLogger('yamdb.slow_queries')
+    logger.addHandler(caplog.handler)
+    yield lambda: [
+        json.loads(record.getMessage()) for record in caplog.records
+        if record.name == 'yamdb.slow_queries'
+    ]
+    logger.removeHandler(caplog.handler)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23SlowQueries:
+
+    def test_01_fingerprint(self):
+        assert normalize(
+            "SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'x' "
+            "AND year > 1990"
+        ) == 'SELECT * FROM t WHERE id IN (...) AND name = %s AND year > %s'
+        assert fingerprint(
+            'SELECT * FROM t WHERE id IN (%s, %s)'
+        ) == fingerprint('SELECT  *  FROM t WHERE id IN (%s, %s, %s, %s)')
+
+    def test_02_log_with_plan(self, client, slow_query_records):
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        category = Category.objects.create(name='Фильм', slug='movie')
+        title = Title.objects.create(name='Фильм', year=2000,
+                                     category=category)
+        title.genre.add(genre)
+        response = client.get(
+            '/api/v1/titles/', {'genre': 'drama', 'name': 'иль'}
+        )
+        assert response.status_code == 200
+        records = [
+            record for record in slow_query_records()
+            if record['view'] and 'reviews_title' in record['sql']
+        ]
+        assert records, (
+            'Проверьте, что запросы дольше порога попадают в журнал.'
+        )
+        record = records[0]
+        assert record['view'].startswith('titles-list'), (
+            'Проверьте, что в журнале указано представление.'
+        )
+        assert record['plan'], (
+            'Проверьте, что в журнал записывается EXPLAIN QUERY PLAN.'
+        )
+        assert len(record['fingerprint']) == 16
+        assert isinstance(record['full_scans'], list)
+
+    def test_03_summary_command(self, client, slow_query_records, tmp_path):
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/?name=a')
+        log_file = tmp_path / 'slow.log'
+        log_file.write_text('\n'.join(
+            json.dumps(record) for record in slow_query_records()
+        ), encoding='utf-8')
+        out = StringIO()
+        call_command('slow_queries', log_file=str(log_file), top=3,
+                     json=True, stdout=out)
+        groups = json.loads(out.getvalue())
+        assert 0 < len(groups) <= 3
+        assert groups == sorted(
+            groups, key=lambda group: group['total_ms'], reverse=True
+        ), 'Проверьте, что запросы отсортированы по суммарному времени.'
+        for key in ('count', 'total_ms', 'mean_ms', 'views', 'full_scans'):
+            assert key in groups[0]
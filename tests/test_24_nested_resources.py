@@ -0,0 +1,84 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Comment, Review, Title
+
+
+def parent_queries(context, table):
+    return [
+        query['sql'] for query in context.captured_queries
+        if query['sql'].startswith('SELECT')
+        and f'FROM "{table}" WHERE' in query['sql']
+    ]
+
+
+@pytest.fixture
+def titles():
+    category = Category.objects.create(name='Фильм', slug='movie')
+    return [
+        Title.objects.create(name=name, year=2000, category=category)
+        for name in ('Первое', 'Второе')
+    ]
+
+
+@pytest.fixture
+def review(titles, admin):
+    return Review.objects.create(
+        title=titles[0], author=admin, text='Отзыв', score=7
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24NestedResources:
+    COMMENTS_URL = '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+
+    def test_01_review_from_other_title(self, user_client, titles, review,
+                                        admin):
+        comment = Comment.objects.create(
+            review=review, author=admin, text='Комментарий'
+        )
+        url = self.COMMENTS_URL.format(
+            title_id=titles[1].pk, review_id=review.pk
+        )
+        requests = (
+            ('get', url, {}),
+            ('post', url, {'text': 'Комментарий'}),
+            ('get', f'{url}{comment.pk}/', {}),
+        )
+        for method, path, data in requests:
+            response = getattr(user_client, method)(path, data=data)
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                f'Проверьте, что {method.upper()}-запрос к `{path}` с '
+                'отзывом другого произведения возвращает ответ со статусом '
+                '404.'
+            )
+        assert Comment.objects.count() == 1
+
+    def test_02_comment_resolves_review_once(self, user_client, titles,
+                                             review):
+        url = self.COMMENTS_URL.format(
+            title_id=titles[0].pk, review_id=review.pk
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data={'text': 'Комментарий'})
+        assert response.status_code == HTTPStatus.CREATED
+        queries = parent_queries(context, 'reviews_review')
+        assert len(queries) == 1, (
+            'Проверьте, что при создании комментария отзыв и произведение '
+            f'проверяются одним запросом, а не {len(queries)}.'
+        )
+        assert '"title_id" =' in queries[0]
+
+    def test_03_review_resolves_title_once(self, user_client, titles):
+        url = f'/api/v1/titles/{titles[0].pk}/reviews/'
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data={'text': 'Отзыв', 'score': 5})
+        assert response.status_code == HTTPStatus.CREATED
+        queries = parent_queries(context, 'reviews_title')
+        assert len(queries) == 1, (
+            'Проверьте, что при создании отзыва произведение читается из '
+            f'БД один раз, а не {len(queries)}.'
+        )
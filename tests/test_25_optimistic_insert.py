@@ -0,0 +1,102 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Review, Title
+
+URL_SIGNUP = '/api/v1/auth/signup/'
+
+
+def selects(context, table):
+    return [
+        query['sql'] for query in context.captured_queries
+        if query['sql'].startswith('SELECT')
+        and f'FROM "{table}"' in query['sql']
+    ]
+
+
+@pytest.fixture
+def title():
+    category = Category.objects.create(name='Фильм', slug='movie')
+    return Title.objects.create(name='Фильм', year=2000, category=category)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25OptimisticInsert:
+
+    def test_01_review_without_precheck(self, user_client, title):
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data={'text': 'Отзыв', 'score': 5})
+        assert response.status_code == HTTPStatus.CREATED
+        assert not selects(context, 'reviews_review'), (
+            'Проверьте, что перед созданием отзыва не выполняется '
+            'проверка существования отзыва: ее заменяет ограничение '
+            '`unique review`.'
+        )
+
+    def test_02_duplicate_review(self, user_client, title):
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        user_client.post(url, data={'text': 'Отзыв', 'score': 5})
+        response = user_client.post(url, data={'text': 'Еще', 'score': 9})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что повторный отзыв пользователя на произведение '
+            'возвращает ответ со статусом 400.'
+        )
+        assert response.json() == {
+            'non_field_errors': ['Должен быть только один отзыв.']
+        }
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (5, 1), (
+            'Проверьте, что отклоненный отзыв не меняет рейтинг.'
+        )
+        assert Review.objects.count() == 1
+
+    def test_03_signup_new_user_without_precheck(self, client):
+        data = {'username': 'new_user', 'email': 'new@yamdb.fake'}
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(URL_SIGNUP, data=data)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == data
+        assert not selects(context, 'users_user'), (
+            'Проверьте, что регистрация нового пользователя не читает '
+            'таблицу пользователей до вставки.'
+        )
+
+    @pytest.mark.parametrize('data, message', (
+        (
+            {'username': 'first', 'email': 'first@yamdb.fake'},
+            None,
+        ),
+        (
+            {'username': 'first', 'email': 'other@yamdb.fake'},
+            'Пользователь с таким именем уже существует.',
+        ),
+        (
+            {'username': 'other', 'email': 'first@yamdb.fake'},
+            'Пользователь с таким адресом электронной почты уже '
+            'существует.',
+        ),
+        (
+            {'username': 'first', 'email': 'second@yamdb.fake'},
+            'Пользователь с таким именем уже существует.',
+        ),
+    ))
+    def test_04_signup_conflicts(self, client, django_user_model, data,
+                                 message):
+        for name in ('first', 'second'):
+            django_user_model.objects.create(
+                username=name, email=f'{name}@yamdb.fake'
+            )
+        response = client.post(URL_SIGNUP, data=data)
+        if message is None:
+            assert response.status_code == HTTPStatus.OK, (
+                'Проверьте, что повторная регистрация с теми же `username` '
+                'и `email` возвращает ответ со статусом 200.'
+            )
+        else:
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+            assert response.json() == {'non_field_errors': [message]}
+        assert django_user_model.objects.count() == 2
@@ -0,0 +1,196 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.authentication import VerifiedTokens
+
+URL_TOKEN = '/api/v1/auth/token/'
+
+
+def obtain_token(user):
+    response = APIClient().post(URL_TOKEN, data={
+        'username': user.username,
+        'confirmation_code': default_token_generator.make_token(user),
+    })
+    assert response.status_code == HTTPStatus.OK
+    return response.json()['access']
+
+
+def client_for(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+def user_selects(context):
+    return [
+        query['sql'] for query in context.captured_queries
+        if query['sql'].startswith('SELECT')
+        and 'FROM "users_user"' in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26StatelessJWT:
+
+    def test_01_token_claims(self, admin):
+        token = AccessToken(obtain_token(admin))
+        for claim, value in (
+            ('username', admin.username),
+            ('role', 'admin'),
+            ('is_superuser', False),
+            ('token_version', 0),
+        ):
+            assert token[claim] == value, (
+                f'Проверьте, что токен доступа содержит `{claim}`.'
+            )
+
+    def test_02_no_user_query(self, admin):
+        client = client_for(obtain_token(admin))
+        client.get('/api/v1/categories/')
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(
+                '/api/v1/categories/', data={'name': 'Фильм', 'slug': 'movie'}
+            )
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что роль администратора берется из токена.'
+        )
+        assert not user_selects(context), (
+            'Проверьте, что аутентификация по токену с ролью не читает '
+            'пользователя из БД.'
+        )
+
+    def test_03_verified_token_cache(self, admin, monkeypatch):
+        client = client_for(obtain_token(admin))
+        client.get('/api/v1/users/')
+
+        def fail(self, raw_token):
+            raise AssertionError('Токен проверен повторно.')
+
+        monkeypatch.setattr(JWTAuthentication, 'get_validated_token', fail)
+        response = client.get('/api/v1/users/')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что проверенный токен берется из LRU-кэша.'
+        )
+
+    def test_04_lru_eviction(self):
+        tokens = VerifiedTokens(2)
+        tokens.set(b'first', 1)
+        tokens.set(b'second', 2)
+        assert tokens.get(b'first') == 1
+        tokens.set(b'third', 3)
+        assert tokens.get(b'second') is None, (
+            'Проверьте, что из кэша вытесняется давно не использованный '
+            'токен.'
+        )
+        assert tokens.get(b'first') == 1
+        assert tokens.get(b'third') == 3
+
+    def test_05_role_change_revokes_tokens(self, admin_client, user):
+        client = client_for(obtain_token(user))
+        assert client.get('/api/v1/users/me/').status_code == HTTPStatus.OK
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'bio': 'Биография'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert client.get('/api/v1/users/me/').status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение пользователя без смены роли не '
+            'отзывает его токены.'
+        )
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'moderator'}
+        )
+        response = client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что смена роли через `/api/v1/users/{username}/` '
+            'отзывает выданные пользователю токены.'
+        )
+        user.refresh_from_db()
+        response = client_for(obtain_token(user)).get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['role'] == 'moderator'
+
+    def test_06_deleted_user(self, admin_client, user):
+        client = client_for(obtain_token(user))
+        assert client.get('/api/v1/users/me/').status_code == HTTPStatus.OK
+        admin_client.delete(f'/api/v1/users/{user.username}/')
+        response = client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что токен удаленного пользователя не принимается.'
+        )
+
+    def test_07_me_full_record(self, user):
+        user.bio = 'Биография'
+        user.save()
+        response = client_for(obtain_token(user)).get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert (data['email'], data['bio']) == (user.email, 'Биография'), (
+            'Проверьте, что `/api/v1/users/me/` возвращает все поля '
+            'пользователя.'
+        )
+
+    def test_08_deactivated_user(self, user):
+        client = client_for(obtain_token(user))
+        assert client.get('/api/v1/users/me/').status_code == HTTPStatus.OK
+        user.is_active = False
+        user.save()
+        response = client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что токен отключенного пользователя не принимается.'
+        )
+
+    def test_09_rename_revokes_tokens(self, admin_client, user):
+        client = client_for(obtain_token(user))
+        response = client.patch('/api/v1/users/me/', data={'username': 'new'})
+        assert response.status_code == HTTPStatus.OK
+        assert client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), (
+            'Проверьте, что смена имени через `/api/v1/users/me/` отзывает '
+            'выданные пользователю токены.'
+        )
+        user.refresh_from_db()
+        client = client_for(obtain_token(user))
+        assert client.get('/api/v1/users/me/').json()['username'] == 'new'
+        admin_client.patch('/api/v1/users/new/', data={'username': 'newer'})
+        assert client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), (
+            'Проверьте, что смена имени через `/api/v1/users/{username}/` '
+            'отзывает выданные пользователю токены.'
+        )
+
+    def test_10_orm_changes_revoke_tokens(self, admin, user):
+        admin.is_superuser = True
+        admin.save()
+        client = client_for(obtain_token(admin))
+        assert client.get('/api/v1/users/').status_code == HTTPStatus.OK
+        admin.is_superuser = False
+        admin.save()
+        assert client.get('/api/v1/users/').status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), (
+            'Проверьте, что снятие прав суперпользователя через ORM '
+            'отзывает выданные токены.'
+        )
+        client = client_for(obtain_token(user))
+        user.bio = 'Биография'
+        user.save(update_fields=['bio'])
+        assert client.get('/api/v1/users/me/').status_code == HTTPStatus.OK
+        user.role = 'moderator'
+        user.save(update_fields=['role'])
+        assert client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), (
+            'Проверьте, что смена роли через ORM (в том числе с '
+            '`update_fields`) отзывает выданные токены.'
+        )
+        user.refresh_from_db()
+        assert user.token_version == 1
@@ -0,0 +1,142 @@
+import threading
+from http import HTTPStatus
+from time import monotonic
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+
+from core.mail import mail_queue
+from core.metrics import registry
+
+URL_SIGNUP = '/api/v1/auth/signup/'
+BACKEND = 'tests.test_27_mail_queue.RecordingBackend'
+
+
+class RecordingBackend(EmailBackend):
+    """Почтовый бэкенд, который ждет разрешения на отправку, считает
+    открытые соединения и может отказывать заданное число раз.
+    """
+
+    sending = threading.Event()
+    release = threading.Event()
+    opened = 0
+    failures = 0
+    rejected = set()
+
+    def open(self):
+        type(self).opened += 1
+        return True
+
+    def send_messages(self, messages):
+        self.sending.set()
+        self.release.wait(5)
+        if type(self).failures:
+            type(self).failures -= 1
+            raise ConnectionError('Сервер недоступен.')
+        if self.rejected.intersection(messages[0].to):
+            raise ValueError('Адрес не существует.')
+        return super().send_messages(messages)
+
+
+@pytest.fixture
+def mail_workers(settings):
+    settings.EMAIL_BACKEND = BACKEND
+    settings.MAIL_WORKERS = 1
+    settings.MAIL_RETRY_DELAY = 0
+    RecordingBackend.sending.clear()
+    RecordingBackend.release.clear()
+    RecordingBackend.opened = RecordingBackend.failures = 0
+    RecordingBackend.rejected = set()
+    yield settings
+    RecordingBackend.release.set()
+    mail_queue.close()
+
+
+def send(number):
+    mail_queue.send('Тема', 'Текст', (f'user{number}@yamdb.fake',))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27MailQueue:
+
+    def test_01_signup_returns_before_delivery(self, client, mail_workers):
+        outbox_before = len(mail.outbox)
+        response = client.post(
+            URL_SIGNUP, data={'username': 'new', 'email': 'new@yamdb.fake'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert len(mail.outbox) == outbox_before, (
+            'Проверьте, что регистрация не ждет отправки письма.'
+        )
+        RecordingBackend.release.set()
+        mail_queue.join()
+        assert len(mail.outbox) == outbox_before + 1
+        assert mail.outbox[-1].to == ['new@yamdb.fake']
+
+    def test_02_batch_over_one_connection(self, mail_workers):
+        send(0)
+        RecordingBackend.sending.wait(5)
+        for number in range(1, 5):
+            send(number)
+        RecordingBackend.release.set()
+        mail_queue.join()
+        assert len(mail.outbox) == 5
+        assert RecordingBackend.opened == 2, (
+            'Проверьте, что письма из очереди отправляются пачкой через '
+            'одно соединение.'
+        )
+
+    def test_03_retry(self, mail_workers):
+        RecordingBackend.failures = 2
+        RecordingBackend.release.set()
+        send(0)
+        mail_queue.join()
+        assert [message.to for message in mail.outbox] == [
+            ['user0@yamdb.fake']
+        ], 'Проверьте, что неотправленное письмо отправляется повторно.'
+        assert RecordingBackend.opened == 3
+
+    def test_04_queue_full(self, client, mail_workers):
+        mail_workers.MAIL_QUEUE_SIZE = 1
+        mail_workers.MAIL_QUEUE_TIMEOUT = 0.01
+        send(0)
+        RecordingBackend.sending.wait(5)
+        send(1)
+        assert 'yamdb_mail_queue_depth 1' in registry.render().splitlines()
+        response = client.post(
+            URL_SIGNUP, data={'username': 'new', 'email': 'new@yamdb.fake'}
+        )
+        assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE, (
+            'Проверьте, что при заполненной очереди писем регистрация '
+            'возвращает ответ со статусом 503.'
+        )
+
+    def test_05_failed_message_does_not_block_batch(self, mail_workers):
+        mail_workers.MAIL_MAX_RETRIES = 1
+        RecordingBackend.rejected = {'user2@yamdb.fake'}
+        send(0)
+        RecordingBackend.sending.wait(5)
+        for number in range(1, 5):
+            send(number)
+        RecordingBackend.release.set()
+        mail_queue.join()
+        assert sorted(message.to[0] for message in mail.outbox) == [
+            f'user{number}@yamdb.fake' for number in (0, 1, 3, 4)
+        ], (
+            'Проверьте, что ошибка отправки одного письма не мешает '
+            'отправке остальных писем пачки.'
+        )
+        assert RecordingBackend.opened == 3
+
+    def test_06_close_with_full_queue(self, mail_workers):
+        mail_workers.MAIL_QUEUE_SIZE = 1
+        send(0)
+        RecordingBackend.sending.wait(5)
+        send(1)
+        started = monotonic()
+        mail_queue.close(timeout=0.1)
+        assert monotonic() - started < 1, (
+            'Проверьте, что остановка очереди не зависает, если очередь '
+            'заполнена.'
+        )
@@ -0,0 +1,55 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+URL_SIGNUP = '/api/v1/auth/signup/'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28SignupQueries:
+
+    @pytest.mark.parametrize('data, status, statements', (
+        (
+            {'username': 'new', 'email': 'new@yamdb.fake'},
+            HTTPStatus.OK,
+            ['INSERT'],
+        ),
+        (
+            {'username': 'first', 'email': 'first@yamdb.fake'},
+            HTTPStatus.OK,
+            ['INSERT', 'SELECT'],
+        ),
+        (
+            {'username': 'first', 'email': 'new@yamdb.fake'},
+            HTTPStatus.BAD_REQUEST,
+            ['INSERT', 'SELECT'],
+        ),
+        (
+            {'username': 'new', 'email': 'first@yamdb.fake'},
+            HTTPStatus.BAD_REQUEST,
+            ['INSERT', 'SELECT'],
+        ),
+        (
+            {'username': 'first', 'email': 'second@yamdb.fake'},
+            HTTPStatus.BAD_REQUEST,
+            ['INSERT', 'SELECT'],
+        ),
+    ))
+    def test_01_single_lookup(self, client, django_user_model, data, status,
+                              statements):
+        for name in ('first', 'second'):
+            django_user_model.objects.create(
+                username=name, email=f'{name}@yamdb.fake'
+            )
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(URL_SIGNUP, data=data)
+        assert response.status_code == status
+        executed = [
+            query['sql'].split()[0] for query in context.captured_queries
+        ]
+        assert executed == statements, (
+            'Проверьте, что регистрация выполняет не больше одной вставки '
+            f'и одного запроса к пользователям, а не {executed}.'
+        )
@@ -0,0 +1,145 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.authentication import RoleAccessToken
+from api.throttling import check_throttle_cache, parse_rate
+from reviews.models import Category
+
+URL_SIGNUP = '/api/v1/auth/signup/'
+URL_TOKEN = '/api/v1/auth/token/'
+
+
+@pytest.fixture
+def throttle_rates(settings):
+    def set_rates(**rates):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': {
+                scope.replace('_', '.'): rate for scope, rate in rates.items()
+            },
+        }
+    return set_rates
+
+
+def signup(client, number, **extra):
+    return client.post(URL_SIGNUP, data={
+        'username': f'user{number}', 'email': f'user{number}@yamdb.fake'
+    }, **extra)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29Throttling:
+
+    def test_01_parse_rate(self):
+        assert parse_rate('5/min') == (5, 5 / 60)
+        assert parse_rate('10/s') == (10, 10)
+
+    def test_02_signup_per_ip(self, client, throttle_rates):
+        throttle_rates(signup_ip='3/min')
+        for number in range(3):
+            assert signup(client, number).status_code == HTTPStatus.OK
+        with CaptureQueriesContext(connection) as context:
+            response = signup(client, 3)
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            f'Проверьте, что частота запросов к `{URL_SIGNUP}` с одного '
+            'IP-адреса ограничена.'
+        )
+        assert int(response['Retry-After']) > 0
+        assert not context.captured_queries, (
+            'Проверьте, что ограниченный запрос отклоняется до обращения '
+            'к БД.'
+        )
+        response = signup(client, 4, REMOTE_ADDR='10.0.0.2')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что у каждого IP-адреса свое ограничение.'
+        )
+
+    def test_03_scopes_are_separate(self, client, throttle_rates):
+        throttle_rates(signup_ip='1/min', token_ip='1/min')
+        assert signup(client, 0).status_code == HTTPStatus.OK
+        response = client.post(
+            URL_TOKEN, data={'username': 'user0', 'confirmation_code': '0'}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = client.post(
+            URL_TOKEN, data={'username': 'user0', 'confirmation_code': '0'}
+        )
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+
+    def test_04_writes_per_user(self, admin, throttle_rates):
+        throttle_rates(writes_user='2/min')
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {RoleAccessToken.for_user(admin)}'
+        )
+        for number in range(2):
+            response = client.post('/api/v1/categories/', data={
+                'name': f'Категория {number}', 'slug': f'category-{number}'
+            })
+            assert response.status_code == HTTPStatus.CREATED
+        response = client.post(
+            '/api/v1/categories/', data={'name': 'Еще', 'slug': 'more'}
+        )
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что частота изменяющих запросов пользователя '
+            'ограничена.'
+        )
+        assert Category.objects.count() == 2
+        assert client.get('/api/v1/categories/').status_code == HTTPStatus.OK, (
+            'Проверьте, что GET-запросы не ограничиваются.'
+        )
+
+    def test_05_bucket_refills(self, client, throttle_rates, monkeypatch):
+        throttle_rates(signup_ip='1/min')
+        now = 1000.0
+        monkeypatch.setattr('api.throttling.time', lambda: now)
+        assert signup(client, 0).status_code == HTTPStatus.OK
+        assert signup(client, 1).status_code == HTTPStatus.TOO_MANY_REQUESTS
+        now += 60
+        assert signup(client, 1).status_code == HTTPStatus.OK, (
+            'Проверьте, что ведро пополняется со временем.'
+        )
+
+    def test_06_forwarded_for_is_not_trusted(self, client, throttle_rates,
+                                             settings):
+        throttle_rates(signup_ip='1/min')
+        assert signup(
+            client, 0, HTTP_X_FORWARDED_FOR='10.0.0.1'
+        ).status_code == HTTPStatus.OK
+        response = signup(client, 1, HTTP_X_FORWARDED_FOR='10.0.0.2')
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что без прокси (`NUM_PROXIES = 0`) подмена '
+            'X-Forwarded-For не дает клиенту новое ведро.'
+        )
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK, 'NUM_PROXIES': 1
+        }
+        response = signup(
+            client, 2, HTTP_X_FORWARDED_FOR='10.0.0.3, 10.0.0.4'
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что за прокси IP-адрес клиента берется из '
+            'X-Forwarded-For.'
+        )
+
+    def test_07_shared_cache(self, settings):
+        assert caches['throttle'].__class__.__name__ not in (
+            'LocMemCache', 'DummyCache'
+        ), (
+            'Проверьте, что ведра хранятся в кэше, общем для процессов.'
+        )
+        assert not check_throttle_cache(None)
+        settings.CACHES = {**settings.CACHES, 'throttle': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }}
+        assert [error.id for error in check_throttle_cache(None)] == [
+            'api.W001'
+        ], (
+            'Проверьте, что кэш ведер в памяти процесса дает '
+            'предупреждение проверки.'
+        )
@@ -0,0 +1,201 @@
+import asyncio
+import json
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connections
+from django.urls import resolve
+
+from api.benchmark import asgi_request, asgi_scope
+from api.mixins import QueryCounter
+from api.views import CategoryViewSet, TitleViewSet
+from core.handlers import URLConfASGIHandler
+from core.slow_queries import slow_query_logger
+from core.timing import record_query
+from tests.utils import create_comments
+
+
+def asgi_get(path, headers=(), method='GET', body=b''):
+    headers = (('Accept', 'application/json'), *headers)
+    if body:
+        headers += (
+            ('Content-Type', 'application/json'),
+            ('Content-Length', str(len(body))),
+        )
+    return asyncio.run(asgi_request(
+        URLConfASGIHandler(), asgi_scope(method, path, headers=headers), body
+    ))
+
+
+def fail(self, request, *args, **kwargs):
+    raise AssertionError('Вызвано синхронное представление.')
+
+
+@pytest.fixture
+def urls(admin_client, user, user_client, moderator, moderator_client):
+    comments, reviews, titles = create_comments(
+        admin_client, {user: user_client, moderator: moderator_client}
+    )
+    title_id, review_id = titles[0]['id'], reviews[0]['id']
+    return (
+        '/api/v1/categories/',
+        '/api/v1/genres/',
+        '/api/v1/titles/',
+        f'/api/v1/titles/{title_id}/',
+        f'/api/v1/titles/{title_id}/reviews/',
+        f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test30AsyncViews:
+
+    def test_01_same_as_wsgi(self, client, urls):
+        for url in urls:
+            for _ in range(2):
+                wsgi = client.get(url, HTTP_ACCEPT='application/json')
+                status, headers, body = asgi_get(url)
+                assert status == wsgi.status_code == HTTPStatus.OK
+                assert json.loads(body) == wsgi.json(), (
+                    f'Проверьте, что под ASGI `{url}` возвращает те же '
+                    'данные, что и под WSGI.'
+                )
+                assert headers['etag'] == wsgi['ETag']
+                assert 'server-timing' in headers
+
+    def test_02_cache_hit_without_sync_view(self, urls, monkeypatch):
+        url = urls[3]
+        status, headers, body = asgi_get(url)
+        assert headers['x-cache'] == 'MISS'
+        monkeypatch.setattr(TitleViewSet, 'retrieve', fail)
+        status, headers, cached = asgi_get(url)
+        assert (status, headers['x-cache']) == (HTTPStatus.OK, 'HIT'), (
+            'Проверьте, что ответ из кэша под ASGI отдается без '
+            'синхронного представления.'
+        )
+        assert cached == body
+
+    def test_03_not_modified_without_sync_view(self, urls, monkeypatch):
+        url = urls[0]
+        _, headers, _ = asgi_get(url)
+        monkeypatch.setattr(CategoryViewSet, 'list', fail)
+        status, not_modified, body = asgi_get(
+            url, (('If-None-Match', headers['etag']),)
+        )
+        assert status == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что ответ 304 под ASGI отдается без синхронного '
+            'представления.'
+        )
+        assert body == b''
+        assert not_modified['etag'] == headers['etag']
+
+    def test_04_authorized_request_uses_sync_view(self, urls, token_admin,
+                                                  monkeypatch):
+        url = urls[3]
+        asgi_get(url)
+        calls = []
+        retrieve = TitleViewSet.retrieve
+
+        def record(self, request, *args, **kwargs):
+            calls.append(request)
+            return retrieve(self, request, *args, **kwargs)
+
+        monkeypatch.setattr(TitleViewSet, 'retrieve', record)
+        status, _, _ = asgi_get(url, (
+            ('Authorization', f'Bearer {token_admin["access"]}'),
+        ))
+        assert status == HTTPStatus.OK
+        assert len(calls) == 1, (
+            'Проверьте, что запрос с заголовком Authorization выполняется '
+            'синхронным представлением DRF.'
+        )
+
+    def test_05_write_falls_back(self, urls, token_admin):
+        status, headers, body = asgi_get(
+            urls[0],
+            (('Authorization', f'Bearer {token_admin["access"]}'),),
+            method='POST',
+            body=json.dumps({'name': 'Аудиокнига', 'slug': 'audiobook'}).encode(),
+        )
+        assert status == HTTPStatus.CREATED, (
+            'Проверьте, что POST-запрос под ASGI выполняется синхронным '
+            'представлением.'
+        )
+        assert json.loads(body) == {'name': 'Аудиокнига', 'slug': 'audiobook'}
+        assert 'queries"' in headers['server-timing']
+        assert 'desc="0 queries"' not in headers['server-timing'], (
+            'Проверьте, что под ASGI учитываются SQL-запросы из потока '
+            'синхронного представления.'
+        )
+
+    def test_06_benchmark(self, tmp_path):
+        call_command('csv_to_db', stdout=StringIO())
+        output = tmp_path / 'concurrency.json'
+        call_command(
+            'benchmark_concurrency', requests=4, concurrency=2, threads=2,
+            client_delay=1, scenario=['titles', 'reviews'],
+            output=str(output), stdout=StringIO(),
+        )
+        results = json.loads(output.read_text(encoding='utf-8'))['results']
+        assert [result['name'] for result in results] == [
+            'titles', 'reviews'
+        ]
+        for result in results:
+            for server in ('wsgi', 'asgi'):
+                assert result[f'{server}_statuses'] == {'200': 4}
+                assert result[f'{server}_rps'] > 0
+
+    def test_07_connection_opened_in_view(self):
+        connection = connections.create_connection('default')
+        counter = QueryCounter()
+        try:
+            with connection.execute_wrapper(counter):
+                connection.ensure_connection()
+            assert connection.execute_wrappers == [
+                record_query, slow_query_logger
+            ], (
+                'Проверьте, что обертки SQL соединения, открытого внутри '
+                '`execute_wrapper()` (поток sync_to_async), не теряются.'
+            )
+            assert counter.count == 0
+        finally:
+            connection.close()
+
+    def test_08_router_actions(self, urls, client, token_admin):
+        for url, name in (
+            ('/api/v1/titles/export/', 'titles-export'),
+            ('/api/v1/titles/bulk/', 'titles-bulk-create'),
+        ):
+            assert resolve(url, urlconf='api_yamdb.asgi_urls').url_name == (
+                name
+            ), f'Проверьте, что под ASGI `{url}` ведет к `{name}`.'
+        authorization = ('Authorization', f'Bearer {token_admin["access"]}')
+        body = json.dumps([
+            {'name': 'Сталкер', 'year': 1979, 'category': 'films',
+             'genre': ['horror']},
+        ]).encode()
+        status, _, _ = asgi_get(
+            '/api/v1/titles/bulk/', (authorization,), method='POST',
+            body=body,
+        )
+        assert status == HTTPStatus.CREATED, (
+            'Проверьте, что пакетное создание произведений работает под '
+            'ASGI.'
+        )
+
+    def test_09_streaming_export(self, urls, admin_client, token_admin):
+        status, headers, body = asgi_get('/api/v1/titles/export/', (
+            ('Authorization', f'Bearer {token_admin["access"]}'),
+        ))
+        assert status == HTTPStatus.OK, (
+            'Проверьте, что потоковая выгрузка произведений работает под '
+            'ASGI.'
+        )
+        assert headers['content-type'] == 'application/x-ndjson'
+        wsgi = b''.join(
+            admin_client.get('/api/v1/titles/export/').streaming_content
+        )
+        assert body == wsgi
+        assert len(body.splitlines()) == 2